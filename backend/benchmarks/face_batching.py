@@ -0,0 +1,93 @@
+"""
+Benchmark: per-request vs micro-batched Facenet inference on CPU.
+
+Fires N concurrent embedding requests at a FaceInferenceService, first with
+batching disabled (max_batch_size=1, the old per-request path) and then with
+the configured batch size, and prints throughput and latency for each.
+
+Usage (from the backend directory):
+    python benchmarks/face_batching.py --images path/to/faces --requests 200
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from face_service import FaceInferenceService  # noqa: E402
+
+def load_images(folder: Path) -> list:
+    images = []
+    for path in sorted(folder.iterdir()):
+        if path.suffix.lower() in (".jpg", ".jpeg", ".png"):
+            images.append(np.array(Image.open(path).convert('RGB')))
+    if not images:
+        raise SystemExit(f"No .jpg/.png face images found in {folder}")
+    return images
+
+async def run(images: list, requests: int, workers: int, batch_size: int, wait_ms: float) -> dict:
+    service = FaceInferenceService(
+        workers=workers,
+        queue_size=requests,
+        timeout=600,
+        max_batch_size=batch_size,
+        max_batch_wait_ms=wait_ms
+    )
+    await service.start()
+    try:
+        # Warm every worker so model loading is not part of the measurement
+        await asyncio.gather(*[service.represent(images[0]) for _ in range(workers)])
+
+        failed = 0
+
+        async def one(i: int) -> float:
+            nonlocal failed
+            started = time.perf_counter()
+            try:
+                await service.represent(images[i % len(images)])
+            except Exception:
+                # No face found, or the service gave up; still counted, so report how many
+                failed += 1
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*[one(i) for i in range(requests)])
+        elapsed = time.perf_counter() - started
+    finally:
+        await service.stop()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "batch_size": batch_size,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "avg_batch": service.metrics()["avg_batch_size"],
+        "failed": failed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=Path, required=True, help="Folder with sample face images")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    print(f"{'mode':<12}{'batch':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'avg batch':>11}{'failed':>8}")
+    for label, batch_size in (("per-request", 1), ("batched", args.batch_size)):
+        r = asyncio.run(run(images, args.requests, args.workers, batch_size, args.wait_ms))
+        print(f"{label:<12}{r['batch_size']:>6}{r['throughput_rps']:>10.1f}{r['p50_ms']:>10.1f}"
+              f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['avg_batch']:>11.2f}{r['failed']:>8}")
+
+if __name__ == "__main__":
+    main()
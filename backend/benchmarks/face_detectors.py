@@ -0,0 +1,141 @@
+"""
+Benchmark: embedding latency and verification accuracy per face detector backend.
+
+Runs the worker's embedding function in-process over a local sample set,
+once per detector backend and input variant:
+  full        the image as captured
+  downscaled  decoded to detector resolution the way the API decodes it (FACE_DETECT_SIZE)
+  precropped  cut to the face beforehand (as a client sending face_cropped does), detection skipped
+and reports per-image latency, images with no face found, and how the
+embeddings verify at the API's FACE_MATCH_THRESHOLD: the share of
+same-person pairs accepted (TAR) and of different-person pairs accepted (FAR).
+
+The sample set is one folder per person with at least two photos each:
+    faces/alice/1.jpg, faces/alice/2.jpg, faces/bob/1.jpg, ...
+
+Usage (from the backend directory):
+    python benchmarks/face_detectors.py --images faces [--backends opencv,ssd,mtcnn,retinaface]
+"""
+
+import argparse
+import io
+import itertools
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+from face_service import FACE_MODEL_NAME, PRECROPPED, _represent  # noqa: E402
+
+def load_people(folder: Path) -> dict:
+    """person -> list of (name, raw image bytes)"""
+    people = {}
+    for person in sorted(p for p in folder.iterdir() if p.is_dir()):
+        photos = [(f"{person.name}/{path.name}", path.read_bytes()) for path in sorted(person.iterdir())
+                  if path.suffix.lower() in (".jpg", ".jpeg", ".png")]
+        if len(photos) >= 2:
+            people[person.name] = photos
+    if len(people) < 2:
+        raise SystemExit(f"Need at least two person folders with two or more photos each in {folder}")
+    return people
+
+def full_frame(data: bytes) -> np.ndarray:
+    return np.array(Image.open(io.BytesIO(data)).convert("RGB"))
+
+def face_crop(image: np.ndarray, backend: str):
+    """The face region a client-side detector would send, or None if no face is found"""
+    from deepface import DeepFace
+    try:
+        faces = DeepFace.extract_faces(img_path=image, detector_backend=backend, enforce_detection=True)
+    except ValueError:
+        return None
+    area = faces[0]["facial_area"]
+    x, y, w, h = (max(0, int(area[k])) for k in ("x", "y", "w", "h"))
+    return np.ascontiguousarray(image[y:y + h, x:x + w])
+
+def measure(samples: dict, backend: str) -> tuple:
+    """Embed every sample; returns (embeddings by sample name, latencies in ms, names with no face)"""
+    embeddings, latencies, missed = {}, [], []
+    for name, image in samples.items():
+        if image is None:
+            missed.append(name)
+            continue
+        started = time.perf_counter()
+        try:
+            embeddings[name] = np.asarray(_represent(image, FACE_MODEL_NAME, backend))
+        except ValueError:
+            missed.append(name)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return embeddings, latencies, missed
+
+def verify(embeddings: dict, people: dict, threshold: float, max_impostor_pairs: int, rng: random.Random) -> tuple:
+    owner = {name: person for person, photos in people.items() for name, _ in photos}
+    names = sorted(embeddings)
+    genuine, impostor = [], []
+    for a, b in itertools.combinations(names, 2):
+        (genuine if owner[a] == owner[b] else impostor).append((a, b))
+    if len(impostor) > max_impostor_pairs:
+        impostor = rng.sample(impostor, max_impostor_pairs)
+
+    def accepted(pairs):
+        if not pairs:
+            return float("nan")
+        hits = sum(float(np.linalg.norm(embeddings[a] - embeddings[b])) < threshold for a, b in pairs)
+        return hits / len(pairs)
+    return accepted(genuine), accepted(impostor), len(genuine), len(impostor)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=Path, required=True, help="Folder with one subfolder of photos per person")
+    parser.add_argument("--backends", default="opencv,ssd", help="Comma-separated DeepFace detector backends")
+    parser.add_argument("--crop-backend", default=None,
+                        help="Detector standing in for the client when making pre-cropped inputs (default: first backend)")
+    parser.add_argument("--threshold", type=float, default=server.FACE_MATCH_THRESHOLD)
+    parser.add_argument("--max-impostor-pairs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    people = load_people(args.images)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    crop_backend = args.crop_backend or backends[0]
+    raw = {name: data for photos in people.values() for name, data in photos}
+
+    full = {name: full_frame(data) for name, data in raw.items()}
+    downscaled = {name: server.decode_image(io.BytesIO(data)) for name, data in raw.items()}
+    # Cropping happens "on the client", so it is not part of the timed work
+    precropped = {name: face_crop(image, crop_backend) for name, image in downscaled.items()}
+
+    runs = [(backend, "full", full) for backend in backends]
+    runs += [(backend, "downscaled", downscaled) for backend in backends]
+    runs.append((PRECROPPED, "precropped", precropped))
+
+    print(f"{len(people)} people, {len(raw)} photos, model {FACE_MODEL_NAME}, threshold {args.threshold}, "
+          f"detector resolution {server.FACE_DETECT_SIZE}px, crops by {crop_backend}")
+    print(f"{'backend':<12}{'input':<12}{'p50 ms':>9}{'p95 ms':>9}{'no face':>9}{'TAR':>8}{'FAR':>8}{'pairs':>13}")
+    for backend, variant, samples in runs:
+        # First call loads the detector and model; keep it out of the numbers
+        warm = next(image for image in samples.values() if image is not None)
+        try:
+            _represent(warm, FACE_MODEL_NAME, backend)
+        except ValueError:
+            pass
+        except Exception as e:
+            print(f"{backend:<12}{variant:<12}unavailable: {e}")
+            continue
+
+        embeddings, latencies, missed = measure(samples, backend)
+        tar, far, genuine_pairs, impostor_pairs = verify(
+            embeddings, people, args.threshold, args.max_impostor_pairs, random.Random(args.seed)
+        )
+        p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (float("nan"), float("nan"))
+        print(f"{backend:<12}{variant:<12}{p50:>9.1f}{p95:>9.1f}{len(missed):>9}{tar:>8.3f}{far:>8.3f}"
+              f"{f'{genuine_pairs}/{impostor_pairs}':>13}")
+
+if __name__ == "__main__":
+    main()
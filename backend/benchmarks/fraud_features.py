@@ -0,0 +1,74 @@
+"""
+Benchmark: fraud feature build time at scale.
+
+Generates N synthetic vote documents (as they come off a Mongo cursor) and
+times fraud.build_features against the old row-by-row loop.
+
+Usage (from the backend directory):
+    python benchmarks/fraud_features.py [--votes 1000000]
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+from bson import ObjectId
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fraud import FEATURE_NAMES, build_features  # noqa: E402
+
+def synthetic_votes(n: int) -> list:
+    rng = np.random.default_rng(42)
+    start = datetime(2026, 1, 1, 8, tzinfo=timezone.utc)
+    users = [str(uuid.uuid4()) for _ in range(max(1, n // 3))]
+    elections = [str(uuid.uuid4()) for _ in range(5)]
+    offsets = np.sort(rng.uniform(0, 10 * 3600, n))
+    votes = []
+    for i in range(n):
+        voted_at = start + timedelta(seconds=float(offsets[i]))
+        verified = rng.random() < 0.7
+        votes.append({
+            "_id": ObjectId(),
+            "user_id": users[rng.integers(len(users))],
+            "election_id": elections[rng.integers(len(elections))],
+            "timestamp": voted_at.isoformat(),
+            "auth_at": (voted_at - timedelta(seconds=float(rng.exponential(90)))).isoformat(),
+            "face_margin": float(rng.uniform(0, 0.6)) if verified else None
+        })
+    return votes
+
+def legacy_features(votes: list) -> list:
+    features = []
+    for vote in votes:
+        vote_time = datetime.fromisoformat(vote['timestamp'])
+        features.append([hash(vote['user_id']) % 1000, vote_time.hour, vote_time.minute])
+    return features
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--votes", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.votes} synthetic votes...")
+    votes = synthetic_votes(args.votes)
+
+    started = time.perf_counter()
+    legacy_features(votes)
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matrix = build_features(votes)
+    vectorized_s = time.perf_counter() - started
+
+    print(f"{'builder':<12}{'features':>10}{'seconds':>10}{'votes/s':>14}")
+    print(f"{'legacy loop':<12}{3:>10}{legacy_s:>10.2f}{args.votes / legacy_s:>14.0f}")
+    print(f"{'vectorized':<12}{matrix.shape[1]:>10}{vectorized_s:>10.2f}{args.votes / vectorized_s:>14.0f}")
+    print(f"features: {', '.join(FEATURE_NAMES)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: base64 JSON face upload vs streamed multipart decode.
+
+For a webcam-sized JPEG, measures per-request latency and peak Python heap
+(tracemalloc) of:
+  - json:      parse the JSON body, then base64_to_image (current path)
+  - multipart: spooled upload file, then decode_image with JPEG draft mode
+
+Usage (from the backend directory):
+    python benchmarks/image_decode.py [--image frame.jpg] [--iterations 50]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import UploadFile  # noqa: E402
+from server import base64_to_image, upload_to_image  # noqa: E402
+
+def sample_jpeg(path: Path = None) -> bytes:
+    if path is not None:
+        return path.read_bytes()
+    # Synthetic 1080p frame; noise keeps the JPEG close to real webcam sizes
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, size=(1080, 1920, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(frame).save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+def json_path(body: bytes) -> np.ndarray:
+    payload = json.loads(body)
+    return base64_to_image(payload["face_image"])
+
+def multipart_path(jpeg: bytes) -> np.ndarray:
+    # Starlette spools multipart parts to a SpooledTemporaryFile as they arrive
+    spooled = SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(jpeg)
+    upload = UploadFile(file=spooled, size=len(jpeg), filename="face.jpg")
+    return asyncio.run(upload_to_image(upload))
+
+def measure(label: str, fn, arg, iterations: int):
+    fn(arg)  # warm caches
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(arg)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    image = fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{label:<10}{p50:>10.2f}{p99:>10.2f}{peak / 1024 / 1024:>12.2f}   {image.shape}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", type=Path, default=None, help="JPEG to use instead of a synthetic 1080p frame")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    jpeg = sample_jpeg(args.image)
+    body = json.dumps({
+        "face_image": "data:image/jpeg;base64," + base64.b64encode(jpeg).decode('ascii')
+    }).encode('utf-8')
+
+    print(f"JPEG: {len(jpeg) / 1024:.0f} KiB, JSON body: {len(body) / 1024:.0f} KiB")
+    print(f"{'path':<10}{'p50 ms':>10}{'p99 ms':>10}{'peak MiB':>12}   decoded shape")
+    measure("json", json_path, body, args.iterations)
+    measure("multipart", multipart_path, jpeg, args.iterations)
+
+if __name__ == "__main__":
+    main()
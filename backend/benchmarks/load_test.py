@@ -0,0 +1,301 @@
+"""
+Load test: throughput and latency of the voting API under realistic traffic mixes.
+
+Boots the FastAPI app in-process (startup hooks included) against a local
+MongoDB or an in-memory mongomock-motor stand-in, with the face model
+stubbed out, seeds elections and candidates, then runs four phases:
+  registration  burst of new voters registering with a face image
+  login         login storm by the same voters
+  polling       polling day: every voter loads the dashboard and votes
+                while observers poll the results
+  results       results night: many observers polling the results
+
+Per endpoint it reports throughput and p50/p95/p99 latency and writes the
+numbers to a JSON file; --compare prints the change against an earlier file.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py [--mongo mock|local] [--voters 200] [--concurrency 50]
+        [--observers 20] [--output load.json] [--compare previous-load.json]
+
+--mongo mock needs mongomock-motor (pip install mongomock-motor).
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+from PIL import Image
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+BENCH_DB = "smartballot_bench_load"
+EMBEDDING_SIZE = 128
+
+class Recorder:
+    """Latency samples and error counts per endpoint"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+
+    async def call(self, http: httpx.AsyncClient, method: str, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await http.request(method, url, **kwargs)
+        self.samples[endpoint].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+    def report(self, wall_seconds: float) -> dict:
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors[endpoint],
+                "throughput_rps": round(len(samples) / wall_seconds, 2),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+                "max_ms": round(max(samples), 2)
+            }
+        return {"wall_seconds": round(wall_seconds, 3), "endpoints": endpoints}
+
+def face_image(voter: int) -> str:
+    """A small JPEG unique to the voter, base64 encoded as the frontend sends it"""
+    rng = np.random.default_rng(voter)
+    img = Image.fromarray(rng.integers(0, 255, (64, 64, 3), dtype=np.uint8))
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG")
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+async def stub_represent(image_array: np.ndarray, cropped: bool = False) -> list:
+    """Stand-in for the face model: the same image always maps to the same embedding"""
+    seed = int.from_bytes(hashlib.blake2b(image_array.tobytes(), digest_size=8).digest(), "little")
+    return np.random.default_rng(seed).normal(size=EMBEDDING_SIZE).tolist()
+
+async def run_phase(name: str, jobs, concurrency: int) -> dict:
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(job):
+        async with semaphore:
+            await job(recorder)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[limited(job) for job in jobs])
+    result = recorder.report(time.perf_counter() - started)
+    print_phase(name, result)
+    return result
+
+def print_phase(name: str, result: dict):
+    print(f"\n{name} ({result['wall_seconds']:.2f}s)")
+    print(f"  {'endpoint':<44}{'reqs':>7}{'errs':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for endpoint, m in result["endpoints"].items():
+        print(f"  {endpoint:<44}{m['requests']:>7}{m['errors']:>6}{m['throughput_rps']:>9.1f}"
+              f"{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}{m['p99_ms']:>9.2f}")
+
+async def seed(http: httpx.AsyncClient, elections: int, candidates: int) -> tuple:
+    response = await http.post("/api/auth/admin/login", json={"email": "admin@voting.gov.in", "password": "admin123"})
+    response.raise_for_status()
+    admin = {"Authorization": f"Bearer {response.json()['token']}"}
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    ballot = {}
+    for e in range(elections):
+        response = await http.post("/api/admin/elections", headers=admin, json={
+            "title": f"Load test election {e}", "description": "Synthetic",
+            "start_date": (now - timedelta(days=1)).isoformat(), "end_date": (now + timedelta(days=1)).isoformat()
+        })
+        response.raise_for_status()
+        election_id = response.json()["election_id"]
+        ballot[election_id] = []
+        for c in range(candidates):
+            response = await http.post("/api/admin/candidates", headers=admin, json={
+                "name": f"Candidate {c}", "party": f"Party {c}", "election_id": election_id
+            })
+            response.raise_for_status()
+            ballot[election_id].append(response.json()["candidate_id"])
+    return admin, ballot
+
+async def run_load(args) -> dict:
+    import server
+
+    if args.mongo == "mock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--mongo mock needs mongomock-motor: pip install mongomock-motor")
+        server.client = AsyncMongoMockClient()
+    else:
+        await server.client.drop_database(BENCH_DB)
+    server.db = server.client[BENCH_DB]
+
+    # Stub the face model; everything else (bcrypt, caches, counters, indexes) is the real thing
+    async def no_face_pool():
+        server.face_service.ready = True
+    server.face_service.start = no_face_pool
+    server.face_service.represent = stub_represent
+
+    await server.startup_db_client()
+    transport = httpx.ASGITransport(app=server.app)
+    limits = httpx.Limits(max_connections=None)
+    phases = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None, limits=limits) as http:
+            admin, ballot = await seed(http, args.elections, args.candidates)
+            election_ids = list(ballot)
+            voters = [
+                {"name": f"Voter {i}", "aadhaar": f"{900000000000 + i}", "email": f"voter{i}@loadtest.example.com",
+                 "password": f"pw-{i}", "gender": random.choice(["Male", "Female", "Other"]), "face_image": face_image(i)}
+                for i in range(args.voters)
+            ]
+            tokens = {}
+
+            def register(i):
+                async def job(rec):
+                    await rec.call(http, "POST", "POST /auth/register", "/api/auth/register", json=voters[i])
+                return job
+
+            def login(i):
+                async def job(rec):
+                    v = voters[i]
+                    response = await rec.call(http, "POST", "POST /auth/login", "/api/auth/login",
+                                              json={"email": v["email"], "password": v["password"]})
+                    if response.status_code == 200:
+                        tokens[i] = {"Authorization": f"Bearer {response.json()['token']}"}
+                return job
+
+            def vote(i):
+                async def job(rec):
+                    headers = tokens.get(i)
+                    if headers is None:
+                        return
+                    await rec.call(http, "GET", "GET /elections/active/status", "/api/elections/active/status", headers=headers)
+                    election_id = random.choice(election_ids)
+                    await rec.call(http, "GET", "GET /elections/{id}/candidates", f"/api/elections/{election_id}/candidates")
+                    # One in twenty votes goes to NOTA
+                    candidate_id = "nota" if random.random() < 0.05 else random.choice(ballot[election_id])
+                    await rec.call(http, "POST", "POST /vote", "/api/vote", headers=headers, json={
+                        "election_id": election_id, "candidate_id": candidate_id, "face_image": voters[i]["face_image"]
+                    })
+                return job
+
+            def observe(polls: int, interval: float):
+                async def job(rec):
+                    for _ in range(polls):
+                        election_id = random.choice(election_ids)
+                        await rec.call(http, "GET", "GET /admin/results/{id}", f"/api/admin/results/{election_id}", headers=admin)
+                        await rec.call(http, "GET", "GET /admin/stats", "/api/admin/stats", headers=admin)
+                        if interval:
+                            await asyncio.sleep(interval)
+                return job
+
+            phases["registration"] = await run_phase(
+                "registration", [register(i) for i in range(args.voters)], args.concurrency)
+            phases["login"] = await run_phase(
+                "login", [login(i) for i in range(args.voters)], args.concurrency)
+            # Observers get their own slots so they poll alongside the voters
+            polling_jobs = [vote(i) for i in range(args.voters)]
+            polling_jobs += [observe(args.observer_polls, 0.05) for _ in range(args.observers)]
+            phases["polling"] = await run_phase("polling", polling_jobs, args.concurrency + args.observers)
+            phases["results"] = await run_phase(
+                "results", [observe(args.observer_polls, 0) for _ in range(args.observers * 5)], args.concurrency)
+
+            # Counters must account for every accepted vote once the load is over
+            polled = await asyncio.gather(*[
+                http.get(f"/api/admin/results/{election_id}", headers=admin) for election_id in election_ids
+            ])
+            counted = sum(r.json()["total_votes"] for r in polled)
+            accepted = phases["polling"]["endpoints"]["POST /vote"]
+            accepted = accepted["requests"] - accepted["errors"]
+            print(f"\n{'✓' if counted == accepted else '✗'} {accepted} votes accepted, {counted} in the results")
+    finally:
+        await server.shutdown_db_client()
+        if args.mongo == "local":
+            # shutdown closed the app's client; use a fresh one to clean up
+            from motor.motor_asyncio import AsyncIOMotorClient
+            cleanup = AsyncIOMotorClient(server.mongo_url)
+            await cleanup.drop_database(BENCH_DB)
+            cleanup.close()
+    return phases
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def compare(current: dict, previous_path: Path):
+    previous = json.loads(previous_path.read_text())
+    print(f"\nChange vs {previous_path.name} (commit {previous.get('commit', '?')})")
+    print(f"  {'phase / endpoint':<56}{'req/s':>10}{'p95':>10}{'p99':>10}")
+    for phase, result in current["phases"].items():
+        before = previous.get("phases", {}).get(phase, {}).get("endpoints", {})
+        for endpoint, m in result["endpoints"].items():
+            if endpoint not in before:
+                continue
+            old = before[endpoint]
+
+            def pct(new_value, old_value):
+                return f"{(new_value - old_value) / old_value * 100:+.1f}%" if old_value else "n/a"
+            print(f"  {phase + ' ' + endpoint:<56}{pct(m['throughput_rps'], old['throughput_rps']):>10}"
+                  f"{pct(m['p95_ms'], old['p95_ms']):>10}{pct(m['p99_ms'], old['p99_ms']):>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo", choices=["mock", "local"], default="local",
+                        help="local: MONGO_URL from .env (a throwaway database is used); mock: in-memory mongomock-motor")
+    parser.add_argument("--voters", type=int, default=200)
+    parser.add_argument("--elections", type=int, default=2)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--observers", type=int, default=20)
+    parser.add_argument("--observer-polls", type=int, default=20)
+    parser.add_argument("--bcrypt-rounds", type=int, help="Override BCRYPT_ROUNDS (default: the app's)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=Path(f"load-{datetime.now():%Y%m%d-%H%M%S}.json"))
+    parser.add_argument("--compare", type=Path, help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    # The app reads its configuration at import time
+    os.environ.setdefault("FRAUD_SCORING", "off")
+    if args.mongo == "mock":
+        os.environ["VOTE_TRANSACTIONS"] = "off"
+    if args.bcrypt_rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    random.seed(args.seed)
+    # One log line per request would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    phases = asyncio.run(run_load(args))
+    result = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "phases": phases
+    }
+    args.output.write_text(json.dumps(result, indent=2))
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(result, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: event-loop latency with request logging off, synchronous, and queued.
+
+Simulated requests log what the login and vote handlers log (attempt,
+face distance, mock email, success) while a probe task measures how late
+the event loop wakes it from a 1 ms sleep. Log output goes to a sink whose
+writes take --write-latency-ms, standing in for a slow terminal or a
+container log driver under pressure.
+  off          logging disabled
+  sync         logging.basicConfig-style StreamHandler on the event loop (the old setup)
+  unlimited    logging_setup.configure_logging with rate limiting off (the queue alone)
+  queued       logging_setup.configure_logging, text output
+  queued-json  as queued, one JSON object per line
+
+No database needed.
+
+Usage (from the backend directory):
+    python benchmarks/logging_overhead.py [--requests 20000] [--concurrency 200] [--write-latency-ms 0.2]
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from logging_setup import configure_logging, sampled  # noqa: E402
+
+SAMPLED_LOG = sampled(0.01)
+logger = logging.getLogger("server")
+
+class SlowSink(io.TextIOBase):
+    """Discards output, but every write blocks for write_latency seconds"""
+
+    def __init__(self, write_latency: float):
+        self.write_latency = write_latency
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        time.sleep(self.write_latency)
+        return len(text)
+
+    def flush(self):
+        pass
+
+async def handle_request(i: int):
+    email = f"voter{i}@example.com"
+    logger.info("Login attempt for: %s", email)
+    await asyncio.sleep(0)
+    logger.info("Face comparison distance: %.4f", random.random() * 0.6, extra=SAMPLED_LOG)
+    await asyncio.sleep(0)
+    logger.info("Mock email to %s: %s", email, "Registration Successful",
+                extra={"email_body": f"Welcome Voter {i}! Your voter account has been created successfully."})
+    await asyncio.sleep(0)
+    logger.info("Login successful for: %s", email)
+
+async def probe_loop_lag(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - started - 0.001) * 1000)
+
+async def drive(requests: int, concurrency: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+    lags: list = []
+    stop = asyncio.Event()
+
+    async def limited(i):
+        async with semaphore:
+            await handle_request(i)
+
+    probe = asyncio.create_task(probe_loop_lag(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*[limited(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return elapsed, lags
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.disable(logging.NOTSET)
+
+def run_mode(mode: str, args) -> None:
+    reset_root()
+    sink = SlowSink(args.write_latency_ms / 1000)
+    pipeline = None
+    if mode == "off":
+        logging.disable(logging.CRITICAL)
+    elif mode == "sync":
+        logging.basicConfig(level=logging.INFO, stream=sink, force=True)
+    else:
+        pipeline = configure_logging(level="INFO", fmt="json" if mode == "queued-json" else "text",
+                                     rate_limit=0 if mode == "unlimited" else 20,
+                                     stream=sink, capture_uvicorn=False)
+
+    elapsed, lags = asyncio.run(drive(args.requests, args.concurrency))
+    extra = ""
+    if pipeline is not None:
+        stats = pipeline.stats()
+        pipeline.stop()
+        extra = f"  dropped {stats['dropped']}, rate limited {stats['rate_limited']}, sampled out {stats['sampled_out']}"
+    p50, p99 = np.percentile(lags, [50, 99]) if lags else (0.0, 0.0)
+    print(f"{mode:<12}{args.requests / elapsed:>10.0f}{p50:>10.3f}{p99:>10.3f}{max(lags, default=0):>10.2f}{sink.writes:>9}{extra}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--write-latency-ms", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{args.requests} simulated requests, {args.concurrency} concurrent, {args.write_latency_ms} ms per log write")
+    print(f"{'mode':<12}{'req/s':>10}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}{'writes':>9}")
+    for mode in ("off", "sync", "unlimited", "queued", "queued-json"):
+        run_mode(mode, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Load test: bcrypt login throughput vs. thread-pool size.
+
+Simulates a login rush by verifying N passwords concurrently from the event
+loop, once inline (the old blocking path) and then through thread pools of
+increasing size. bcrypt releases the GIL, so throughput should scale with
+cores until the pool is larger than the machine.
+
+Usage (from the backend directory):
+    python benchmarks/password_hashing.py [--logins 64] [--rounds 12]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+PASSWORD = b"correct horse battery staple"
+
+async def login_rush(hashed: bytes, logins: int, workers: int) -> float:
+    loop = asyncio.get_running_loop()
+    if workers == 0:
+        started = time.perf_counter()
+        for _ in range(logins):
+            bcrypt.checkpw(PASSWORD, hashed)
+        return logins / (time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, bcrypt.checkpw, PASSWORD, hashed) for _ in range(logins)
+        ])
+        return logins / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    hashed = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(args.rounds))
+    cores = os.cpu_count() or 1
+    pool_sizes = sorted({0, 1, 2, 4, cores, cores * 2})
+
+    print(f"bcrypt cost {args.rounds}, {args.logins} concurrent logins, {cores} cores")
+    print(f"{'workers':<10}{'logins/s':>10}{'speedup':>10}")
+    baseline = None
+    for workers in pool_sizes:
+        rate = asyncio.run(login_rush(hashed, args.logins, workers))
+        baseline = baseline or rate
+        label = "inline" if workers == 0 else str(workers)
+        print(f"{label:<10}{rate:>10.1f}{rate / baseline:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
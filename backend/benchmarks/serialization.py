@@ -0,0 +1,106 @@
+"""
+Benchmark: response size and encode time per read endpoint.
+
+Builds representative payloads for each read endpoint and encodes them two ways:
+  - legacy:  the documents the handler used to return, through
+             jsonable_encoder + JSONResponse (FastAPI's default path)
+  - current: the projected documents, validated and dumped by the
+             endpoint's response model, rendered by ORJSONResponse
+
+No database needed.
+
+Usage (from the backend directory):
+    python benchmarks/serialization.py [--repeat 200]
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+NOW = datetime.now(timezone.utc).isoformat()
+
+def election(i: int) -> dict:
+    return {"id": str(uuid.uuid4()), "title": f"Election {i}", "description": "General election " * 4,
+            "start_date": NOW, "end_date": NOW, "status": "active", "created_at": NOW}
+
+def candidate(election_id: str, i: int) -> dict:
+    return {"id": str(uuid.uuid4()), "name": f"Candidate {i}", "party": "Party", "election_id": election_id,
+            "image_url": "https://images.unsplash.com/photo-1659355894117-0ae6f8f28d0b",
+            "description": "Candidate manifesto " * 4, "vote_count": 0}
+
+def voter(i: int, elections: list) -> dict:
+    return {"id": str(uuid.uuid4()), "name": f"Voter {i}", "aadhaar": f"{i:012d}", "gender": "Female",
+            "email": f"voter{i}@example.com", "status": "active", "voted": True,
+            "voted_elections": [e["id"] for e in elections[:5]], "created_at": NOW}
+
+def vote(i: int) -> dict:
+    return {"id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "election_id": str(uuid.uuid4()),
+            "candidate_id": str(uuid.uuid4()), "timestamp": NOW, "auth_at": NOW, "face_margin": 0.21,
+            "fraud_score": -0.05 - i * 1e-6, "is_anomaly": True, "fraud_model_version": "20260101T000000Z"}
+
+def only(doc: dict, projection: dict) -> dict:
+    return {k: v for k, v in doc.items() if projection.get(k)}
+
+def payloads():
+    """(endpoint, legacy content, current content, response model) per read endpoint"""
+    elections = [election(i) for i in range(20)]
+    candidates = [candidate(elections[0]["id"], i) for i in range(10)]
+    voters = [voter(i, elections) for i in range(50)]
+    votes = [vote(i) for i in range(1000)]
+    results = [{**c, "vote_count": 1000 - i} for i, c in enumerate(candidates)]
+    stats = {"total_users": 1_000_000, "total_elections": 20, "active_elections": 20, "total_votes": 750_000,
+             "gender_stats": {"Male": 500_000, "Female": 490_000, "Other": 10_000}}
+    return [
+        ("/elections/active", {"elections": elections},
+         {"elections": [only(e, server.ELECTION_PROJECTION) for e in elections]}, server.ElectionList),
+        ("/elections/{id}/candidates", {"candidates": candidates},
+         {"candidates": [only(c, server.CANDIDATE_PROJECTION) for c in candidates]}, server.CandidateList),
+        ("/admin/voters", {"voters": voters},
+         {"voters": [only(v, server.VOTER_LIST_PROJECTION) for v in voters], "next_cursor": "x",
+          "total": 1_000_000, "total_is_estimate": True}, server.VoterPage),
+        ("/admin/results/{id}", {"candidates": results, "total_votes": 5000},
+         {"candidates": [only(c, {**server.CANDIDATE_PROJECTION, "vote_count": 1}) for c in results],
+          "total_votes": 5000, "version": 1}, server.ElectionResults),
+        ("/admin/fraud/detect", {"success": True, "suspicious_votes": votes, "analysis_metrics": {}},
+         {"success": True, "suspicious_votes": [only(v, server.SUSPICIOUS_VOTE_PROJECTION) for v in votes],
+          "analysis_metrics": {}}, server.FraudReport),
+        ("/admin/stats", stats, {**stats, "freshness": {"reconciled_at": NOW}}, server.AdminStats),
+    ]
+
+def timed(encode, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = encode()
+    return len(body), (time.perf_counter() - started) / repeat * 1e6
+
+def main(repeat: int):
+    print(f"{'endpoint':<28}{'legacy B':>10}{'legacy us':>11}{'current B':>11}{'current us':>12}")
+    for endpoint, legacy, current, model in payloads():
+        adapter = TypeAdapter(model)
+        legacy_bytes, legacy_us = timed(
+            lambda: JSONResponse(content=None).render(jsonable_encoder(legacy)), repeat
+        )
+        current_bytes, current_us = timed(
+            lambda: ORJSONResponse(content=None).render(
+                adapter.dump_python(adapter.validate_python(current), mode="json")
+            ),
+            repeat
+        )
+        print(f"{endpoint:<28}{legacy_bytes:>10}{legacy_us:>11.1f}{current_bytes:>11}{current_us:>12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.repeat)
@@ -0,0 +1,197 @@
+"""
+Benchmark: vote submission latency, legacy sequential path vs consolidated commit.
+
+Seeds a throwaway database with one election, a few candidates and N voters,
+then casts one vote per voter through:
+  - legacy: the six sequential round-trips submit_vote used to make
+  - current: server._submit_vote (parallel lookups + commit_vote)
+
+Run against a replica set to measure the transactional commit, or a
+standalone mongod (or --mongo mock) for the ordered fallback.
+
+Afterwards it checks the commit is all-or-nothing:
+  - consistency: every voter marked as voted has exactly one vote record, and
+    the counter shards add up to the number of votes
+  - rollback: a vote whose counter write fails leaves no voted flag and no
+    vote record behind
+
+Usage (from the backend directory):
+    python benchmarks/vote_commit.py [--mongo mock|local] [--rtt-ms 1.0] [--voters 1000] [--concurrency 50]
+
+--mongo mock needs mongomock-motor (pip install mongomock-motor). An in-memory
+database answers without a network hop, which hides what the consolidated path
+saves, so --rtt-ms adds a simulated round trip to every mock database call.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+BENCH_DB = "smartballot_bench_votes"
+
+async def seed(db, voters: int):
+    await db.client.drop_database(BENCH_DB)
+    now = datetime.now(timezone.utc)
+    election_id = str(uuid.uuid4())
+    await db.elections.insert_one({
+        "id": election_id, "title": "Bench", "description": "", "status": "active",
+        "start_date": (now - timedelta(days=1)).replace(tzinfo=None).isoformat(),
+        "end_date": (now + timedelta(days=1)).replace(tzinfo=None).isoformat(),
+        "created_at": now.isoformat()
+    })
+    candidate_ids = [str(uuid.uuid4()) for _ in range(4)]
+    await db.candidates.insert_many([
+        {"id": cid, "name": f"C{i}", "party": "P", "election_id": election_id, "vote_count": 0}
+        for i, cid in enumerate(candidate_ids)
+    ])
+    user_ids = [str(uuid.uuid4()) for _ in range(voters)]
+    await db.users.insert_many([
+        {"id": uid, "email": f"{uid}@bench", "status": "active", "face_embedding": [],
+         "voted": False, "voted_elections": [], "created_at": now.isoformat()}
+        for uid in user_ids
+    ])
+    return election_id, candidate_ids, user_ids
+
+async def legacy_vote(db, user_id: str, election_id: str, candidate_id: str):
+    await db.users.find_one({"id": user_id}, {"_id": 0})
+    await db.elections.find_one({"id": election_id})
+    await db.candidates.find_one({"id": candidate_id, "election_id": election_id})
+    await db.users.update_one(
+        {"id": user_id, "voted_elections": {"$ne": election_id}},
+        {"$set": {"voted": True}, "$push": {"voted_elections": election_id}}
+    )
+    await db.votes.insert_one({
+        "id": str(uuid.uuid4()), "user_id": user_id, "election_id": election_id,
+        "candidate_id": candidate_id, "timestamp": datetime.now(timezone.utc).isoformat()
+    })
+    await db.candidates.update_one({"id": candidate_id}, {"$inc": {"vote_count": 1}})
+
+async def current_vote(db, user_id: str, election_id: str, candidate_id: str):
+    token = server.create_token(user_id, f"{user_id}@bench")
+    await server._submit_vote(
+        server.VoteSubmit(election_id=election_id, candidate_id=candidate_id),
+        None,
+        server.decode_token_cached(token)
+    )
+
+async def run(label: str, vote_fn, voters: int, concurrency: int):
+    db = server.db
+    election_id, candidate_ids, user_ids = await seed(db, voters)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int, user_id: str):
+        async with semaphore:
+            started = time.perf_counter()
+            await vote_fn(db, user_id, election_id, candidate_ids[i % len(candidate_ids)])
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i, uid) for i, uid in enumerate(user_ids)])
+    elapsed = time.perf_counter() - started
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{label:<10}{voters / elapsed:>10.1f}{p50:>10.2f}{p99:>10.2f}")
+    return election_id
+
+async def check_consistency(db, election_id: str) -> bool:
+    voted = await db.users.count_documents({"voted_elections": election_id})
+    votes = await db.votes.count_documents({"election_id": election_id})
+    voters_with_votes = len(await db.votes.distinct("user_id", {"election_id": election_id}))
+    counted = sum((await server.get_vote_totals(election_id)).values())
+    ok = voted == votes == voters_with_votes == counted
+    print(f"{'✓' if ok else '✗'} consistency: {voted} voters marked, {votes} votes "
+          f"({voters_with_votes} distinct voters), {counted} counted")
+    return ok
+
+async def check_rollback(db) -> bool:
+    election_id, candidate_ids, user_ids = await seed(db, 1)
+    # A counter document $inc cannot apply to makes the last write of the commit fail
+    await db.vote_counters.insert_many([
+        {"election_id": election_id, "candidate_id": candidate_ids[0], "shard": shard, "count": "broken"}
+        for shard in range(server.VOTE_COUNTER_SHARDS)
+    ])
+    try:
+        await current_vote(db, user_ids[0], election_id, candidate_ids[0])
+        failed = False
+    except HTTPException:
+        failed = True
+    user = await db.users.find_one({"id": user_ids[0]}, {"_id": 0, "voted": 1, "voted_elections": 1})
+    votes = await db.votes.count_documents({"election_id": election_id})
+    # The seeded voter has no other election, so both the election entry and voted must be undone
+    cleared = election_id not in user["voted_elections"] and not user.get("voted")
+    ok = failed and cleared and votes == 0
+    print(f"{'✓' if ok else '✗'} rollback: failed commit {'rejected' if failed else 'accepted'}, "
+          f"voted flags {'cleared' if cleared else 'left set'} (voted={user.get('voted')}, "
+          f"voted_elections={user['voted_elections']}), {votes} vote records")
+    return ok
+
+def add_round_trips(rtt: float):
+    """Make every mongomock-motor call that would cross the network wait rtt seconds first"""
+    import mongomock_motor
+
+    def delayed(method):
+        async def wrapper(self, *args, **kwargs):
+            await asyncio.sleep(rtt)
+            return await method(self, *args, **kwargs)
+        return wrapper
+
+    collection = mongomock_motor.AsyncMongoMockCollection
+    for name in ("find_one", "find_one_and_update", "insert_one", "insert_many", "update_one",
+                 "update_many", "delete_one", "bulk_write", "count_documents", "distinct"):
+        setattr(collection, name, delayed(getattr(collection, name)))
+    for cursor in (mongomock_motor.AsyncCursor, mongomock_motor.AsyncCommandCursor):
+        cursor.to_list = delayed(cursor.to_list)
+
+async def main(mongo: str, voters: int, concurrency: int, rtt_ms: float) -> bool:
+    if mongo == "mock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--mongo mock needs mongomock-motor: pip install mongomock-motor")
+        if rtt_ms > 0:
+            add_round_trips(rtt_ms / 1000)
+        server.client = AsyncMongoMockClient()
+        server.VOTE_TRANSACTIONS = "off"
+    # Point the app's module-level handle at a throwaway database
+    server.db = server.client[BENCH_DB]
+    if server.VOTE_TRANSACTIONS == "auto":
+        hello = await server.client.admin.command('hello')
+        server.vote_transactions_enabled = 'setName' in hello or hello.get('msg') == 'isdbgrid'
+    try:
+        network = f" ({rtt_ms} ms simulated round trips)" if mongo == "mock" and rtt_ms > 0 else ""
+        print(f"{mongo} MongoDB{network}, transactions: {server.vote_transactions_enabled}, "
+              f"{voters} voters, concurrency {concurrency}")
+        print(f"{'path':<10}{'votes/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        await run("legacy", legacy_vote, voters, concurrency)
+        election_id = await run("current", current_vote, voters, concurrency)
+        consistent = await check_consistency(server.db, election_id)
+        return await check_rollback(server.db) and consistent
+    finally:
+        await server.client.drop_database(BENCH_DB)
+        server.client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo", choices=["mock", "local"], default="local",
+                        help="local: MONGO_URL from .env (a throwaway database is used); mock: in-memory mongomock-motor")
+    parser.add_argument("--rtt-ms", type=float, default=1.0,
+                        help="Simulated network round trip per database call with --mongo mock (0: none)")
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    # The rollback check logs the failure it provokes; keep the report readable
+    logging.getLogger("server").setLevel(logging.CRITICAL)
+    sys.exit(0 if asyncio.run(main(args.mongo, args.voters, args.concurrency, args.rtt_ms)) else 1)
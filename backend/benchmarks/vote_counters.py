@@ -0,0 +1,68 @@
+"""
+Benchmark: concurrent votes for one candidate, single counter vs sharded counters.
+
+Drives N concurrent $inc operations at a single candidate, first against one
+document (the old candidates.vote_count pattern) and then spread over K
+shard documents in vote_counters, and reports increments per second.
+
+Usage (from the backend directory):
+    python benchmarks/vote_counters.py [--votes 20000] [--concurrency 200] [--shards 16]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env", override=True)
+
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+BENCH_DB = "smartballot_bench_counters"
+
+async def run(collection, votes: int, concurrency: int, shards: int) -> float:
+    await collection.drop()
+    await collection.create_index([("election_id", 1), ("candidate_id", 1), ("shard", 1)], unique=True)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def vote():
+        async with semaphore:
+            await collection.update_one(
+                {"election_id": "bench", "candidate_id": "popular", "shard": random.randrange(shards)},
+                {"$inc": {"count": 1}},
+                upsert=True
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*[vote() for _ in range(votes)])
+    elapsed = time.perf_counter() - started
+
+    total = await collection.aggregate([
+        {"$group": {"_id": None, "count": {"$sum": "$count"}}}
+    ]).to_list(None)
+    assert total[0]["count"] == votes, "lost increments"
+    return votes / elapsed
+
+async def main(votes: int, concurrency: int, shards: int):
+    client = AsyncIOMotorClient(MONGO_URL, maxPoolSize=concurrency)
+    collection = client[BENCH_DB].vote_counters
+    try:
+        print(f"{votes} votes, {concurrency} concurrent, one candidate")
+        print(f"{'shards':<8}{'votes/s':>10}")
+        for k in sorted({1, shards}):
+            print(f"{k:<8}{await run(collection, votes, concurrency, k):>10.1f}")
+    finally:
+        await client.drop_database(BENCH_DB)
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--votes", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--shards", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.votes, args.concurrency, args.shards))
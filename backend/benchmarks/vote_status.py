@@ -0,0 +1,125 @@
+"""
+Benchmark: voter dashboard load, per-election status calls vs the batch endpoint.
+
+Seeds a throwaway database with N active elections and a voter who has
+voted in half of them, then loads the dashboard the way the frontend does,
+through the ASGI app in-process:
+  - legacy: GET /elections/active, then one status request per election, served
+            by a copy of the handler as it was before the batch endpoint
+            (token decoded on every call, whole user document fetched)
+  - status: the same N+1 requests against today's GET /vote/status/{id}
+  - batch:  GET /elections/active/status
+
+Usage (from the backend directory):
+    python benchmarks/vote_status.py [--mongo mock|local] [--elections 10] [--loads 200]
+
+--mongo mock needs mongomock-motor (pip install mongomock-motor).
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+from fastapi import Header, HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+BENCH_DB = "smartballot_bench_status"
+
+async def seed(db, elections: int) -> str:
+    await db.client.drop_database(BENCH_DB)
+    now = datetime.now(timezone.utc)
+    election_ids = [str(uuid.uuid4()) for _ in range(elections)]
+    await db.elections.insert_many([
+        {"id": eid, "title": f"Election {i}", "description": "", "status": "active",
+         "start_date": (now - timedelta(days=1)).replace(tzinfo=None).isoformat(),
+         "end_date": (now + timedelta(days=1)).replace(tzinfo=None).isoformat(),
+         "created_at": now.isoformat()}
+        for i, eid in enumerate(election_ids)
+    ])
+    user_id = str(uuid.uuid4())
+    # A registered voter carries a full face embedding, which the legacy path re-fetched per call
+    await db.users.insert_one({
+        "id": user_id, "email": "voter@bench", "status": "active",
+        "face_embedding": server.encode_embedding([0.1] * 512, server.EMBEDDING_FORMAT),
+        "voted": True, "voted_elections": election_ids[::2], "created_at": now.isoformat()
+    })
+    return user_id
+
+@server.app.get("/bench/legacy/vote/status/{election_id}")
+async def legacy_vote_status(election_id: str, authorization: str = Header(None)):
+    """GET /vote/status/{id} as it was before the batch endpoint"""
+    if not authorization or not authorization.startswith('Bearer '):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    payload = server.decode_token(authorization.split(' ')[1])
+    user = await server.db.users.find_one({"id": payload['user_id']}, {"_id": 0})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"has_voted": election_id in user.get('voted_elections', [])}
+
+def per_election_load(status_path: str):
+    async def load(http: httpx.AsyncClient, headers: dict) -> int:
+        response = await http.get("/api/elections/active", headers=headers)
+        elections = response.json()["elections"]
+        await asyncio.gather(*[
+            http.get(status_path.format(election["id"]), headers=headers) for election in elections
+        ])
+        return 1 + len(elections)
+    return load
+
+async def batch_load(http: httpx.AsyncClient, headers: dict) -> int:
+    await http.get("/api/elections/active/status", headers=headers)
+    return 1
+
+async def run(label: str, load_fn, http: httpx.AsyncClient, headers: dict, loads: int):
+    latencies = []
+    requests = 0
+    for _ in range(loads):
+        started = time.perf_counter()
+        requests += await load_fn(http, headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{label:<8}{requests / loads:>14.0f}{p50:>10.2f}{p99:>10.2f}")
+
+async def main(mongo: str, elections: int, loads: int):
+    if mongo == "mock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--mongo mock needs mongomock-motor: pip install mongomock-motor")
+        server.client = AsyncMongoMockClient()
+    # Point the app's module-level handle at a throwaway database
+    server.db = server.client[BENCH_DB]
+    try:
+        user_id = await seed(server.db, elections)
+        headers = {"Authorization": f"Bearer {server.create_token(user_id, 'voter@bench')}"}
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            print(f"{elections} active elections, {loads} dashboard loads, {mongo} MongoDB")
+            print(f"{'path':<8}{'requests/load':>14}{'p50 ms':>10}{'p99 ms':>10}")
+            await run("legacy", per_election_load("/bench/legacy/vote/status/{}"), http, headers, loads)
+            await run("status", per_election_load("/api/vote/status/{}"), http, headers, loads)
+            await run("batch", batch_load, http, headers, loads)
+    finally:
+        await server.client.drop_database(BENCH_DB)
+        server.client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo", choices=["mock", "local"], default="local",
+                        help="local: MONGO_URL from .env (a throwaway database is used); mock: in-memory mongomock-motor")
+    parser.add_argument("--elections", type=int, default=10)
+    parser.add_argument("--loads", type=int, default=200)
+    args = parser.parse_args()
+    # One log line per request would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(args.mongo, args.elections, args.loads))
@@ -0,0 +1,97 @@
+"""
+Small in-process TTL cache for read-mostly data (elections, candidates).
+
+Entries expire after a TTL and can be invalidated explicitly when an admin
+changes the underlying documents. A load that was already in flight when its
+key was invalidated may have read the old documents, so its result is
+returned to its caller but not cached. Hit/miss counters are kept for
+monitoring.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, name: str, ttl: float = 30.0, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Invalidation generations, tracked only for keys with a load in flight
+        self._loading: Dict[Hashable, int] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_loads = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store value; ttl overrides the cache-wide TTL for this entry"""
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value, or await loader() and cache a non-None result"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        generation = self._generation(key)
+        self._loading[key] = self._loading.get(key, 0) + 1
+        try:
+            value = await loader()
+        finally:
+            self._loading[key] -= 1
+            current = self._generation(key)
+            if not self._loading[key]:
+                del self._loading[key]
+                self._generations.pop(key, None)
+        if value is not None:
+            if current == generation:
+                self.set(key, value)
+            else:
+                # Invalidated while loading: the result may predate the change
+                self.stale_loads += 1
+        return value
+
+    def _generation(self, key: Hashable) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(key, 0)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one key, or everything when key is None"""
+        self.invalidations += 1
+        if key is None:
+            self._epoch += 1
+            self._entries.clear()
+        else:
+            if key in self._loading:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "stale_loads": self.stale_loads
+        }
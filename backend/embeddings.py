@@ -0,0 +1,56 @@
+"""
+Compact storage format for face embeddings.
+
+Embeddings are stored in MongoDB as BSON binary (user-defined subtype)
+holding a one-byte format tag followed by the packed little-endian vector:
+
+    tag 1 -> float32, tag 2 -> float16
+
+Legacy documents still hold a plain list of floats; decode_embedding
+accepts both so reads keep working during and after the migration.
+"""
+
+from typing import Optional, Sequence, Union
+
+import numpy as np
+from bson.binary import Binary
+
+EMBEDDING_BINARY_SUBTYPE = 0x80
+
+FORMAT_FLOAT32 = 1
+FORMAT_FLOAT16 = 2
+
+_DTYPES = {
+    FORMAT_FLOAT32: np.dtype('<f4'),
+    FORMAT_FLOAT16: np.dtype('<f2'),
+}
+_FORMATS_BY_NAME = {
+    "float32": FORMAT_FLOAT32,
+    "float16": FORMAT_FLOAT16,
+}
+
+def format_for_dtype(name: str) -> int:
+    """Map a dtype name from configuration ("float32"/"float16") to a format tag"""
+    try:
+        return _FORMATS_BY_NAME[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported embedding dtype: {name}")
+
+def encode_embedding(embedding: Union[Sequence[float], np.ndarray], fmt: int = FORMAT_FLOAT32) -> Binary:
+    """Pack an embedding into tagged BSON binary"""
+    vector = np.asarray(embedding, dtype=_DTYPES[fmt])
+    return Binary(bytes([fmt]) + vector.tobytes(), EMBEDDING_BINARY_SUBTYPE)
+
+def decode_embedding(stored) -> Optional[np.ndarray]:
+    """Turn a stored embedding (tagged binary or legacy float list) into a float32 array"""
+    if stored is None or len(stored) == 0:
+        return None
+    if isinstance(stored, (bytes, bytearray, memoryview)):
+        data = memoryview(stored)
+        fmt = data[0]
+        if fmt not in _DTYPES:
+            raise ValueError(f"Unknown embedding format tag: {fmt}")
+        vector = np.frombuffer(data, dtype=_DTYPES[fmt], offset=1)
+        # float32 is a zero-copy view; float16 is widened for distance maths
+        return vector if fmt == FORMAT_FLOAT32 else vector.astype(np.float32)
+    return np.asarray(stored, dtype=np.float32)
@@ -0,0 +1,225 @@
+"""
+In-process 1:N face embedding index for duplicate-registration checks.
+
+Embeddings are L2-normalized and stored in fixed-size float32 shards, so a
+lookup is one matrix-vector product per shard. Shards can be memory-mapped
+from a directory to keep them out of the heap; the files there are
+per-process scratch space (anonymous temporary files, removed when the
+process exits) and nothing is read back, as the index is rebuilt from
+MongoDB on every start. The index is filled incrementally from the users collection by
+created_at, and registrations in this process are added directly. Each sync
+re-reads the ids of the last lookback_seconds before its high-water mark, so
+users committed late (by another worker, or a bulk import batch stamped
+before its insert) are still picked up.
+"""
+
+import asyncio
+import logging
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from embeddings import decode_embedding
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 128  # Facenet
+
+class _Shard:
+    """Fixed-capacity block of normalized embeddings"""
+
+    def __init__(self, capacity: int, dim: int, directory: Optional[Path] = None):
+        if directory is not None:
+            # An unlinked file private to this process; workers sharing the
+            # directory must never map each other's rows
+            self._file = tempfile.TemporaryFile(dir=directory, prefix="faces_")
+            self.matrix = np.memmap(self._file, mode='w+', dtype=np.float32, shape=(capacity, dim))
+        else:
+            self.matrix = np.empty((capacity, dim), dtype=np.float32)
+        self.ids: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.matrix.shape[0]
+
+class FaceIndex:
+    """Nearest-neighbour lookup over registered face embeddings (cosine distance)"""
+
+    def __init__(self, threshold: float = 0.40, shard_size: int = 65536,
+                 dim: int = EMBEDDING_DIM, mmap_dir: Optional[str] = None,
+                 lookback_seconds: float = 30.0):
+        self.threshold = threshold
+        self.lookback_seconds = lookback_seconds
+        self.shard_size = shard_size
+        self.dim = dim
+        self.mmap_dir = Path(mmap_dir) if mmap_dir else None
+        if self.mmap_dir is not None:
+            self.mmap_dir.mkdir(parents=True, exist_ok=True)
+
+        self._shards: List[_Shard] = []
+        self._known_ids: Set[str] = set()
+        self._write_lock = threading.Lock()
+        self._sync_lock = asyncio.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+        self._synced_at: Optional[float] = None  # time.monotonic() of the last finished sync
+        self._synced_until: Optional[str] = None
+        # Users without a face inside the lookback window, so they are not fetched again
+        self._faceless: Dict[str, str] = {}
+        self.last_sync_at: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._known_ids)
+
+    def _normalize(self, embedding) -> Optional[np.ndarray]:
+        vector = decode_embedding(embedding)
+        if vector is None:
+            return None
+        vector = vector.reshape(-1)
+        if vector.shape[0] != self.dim:
+            return None
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def add(self, user_id: str, embedding) -> bool:
+        """Add one embedding; returns False if it is already indexed or malformed"""
+        if user_id in self._known_ids:
+            return False
+        vector = self._normalize(embedding)
+        if vector is None:
+            return False
+        with self._write_lock:
+            if not self._shards or self._shards[-1].full:
+                self._shards.append(_Shard(self.shard_size, self.dim, self.mmap_dir))
+            shard = self._shards[-1]
+            # Write the row before publishing it through ids, so readers never see a half row
+            shard.matrix[shard.count] = vector
+            shard.ids.append(user_id)
+            self._known_ids.add(user_id)
+        return True
+
+    def search(self, embedding) -> Optional[Tuple[str, float]]:
+        """Return (user_id, cosine distance) of the nearest face within threshold, or None"""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+        best_id, best_score = None, -1.0
+        for shard in list(self._shards):
+            count = shard.count
+            if count == 0:
+                continue
+            scores = shard.matrix[:count] @ query
+            row = int(np.argmax(scores))
+            if scores[row] > best_score:
+                best_id, best_score = shard.ids[row], float(scores[row])
+        if best_id is None:
+            return None
+        distance = 1.0 - best_score
+        if distance <= self.threshold:
+            return best_id, distance
+        return None
+
+    async def sync(self, users_collection, batch_size: int = 10000, max_age: Optional[float] = None) -> int:
+        """Pull users registered since the last sync into the index.
+
+        With max_age, a sync that finished less than max_age seconds ago is good
+        enough and one already in flight is joined, instead of queueing another
+        scan behind it (registration bursts would otherwise serialize on it).
+        """
+        if max_age is not None:
+            if self._synced_at is not None and time.monotonic() - self._synced_at < max_age:
+                return 0
+            if self._sync_task is not None and not self._sync_task.done():
+                return await asyncio.shield(self._sync_task)
+        task = asyncio.ensure_future(self._locked_sync(users_collection, batch_size))
+        self._sync_task = task
+        # Shielded so a caller that goes away doesn't cancel the sync others have joined
+        return await asyncio.shield(task)
+
+    async def _locked_sync(self, users_collection, batch_size: int) -> int:
+        async with self._sync_lock:
+            if self._synced_until is None:
+                added = await self._full_sync(users_collection, batch_size)
+            else:
+                added = await self._incremental_sync(users_collection, batch_size)
+            self.last_sync_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            self._synced_at = time.monotonic()
+            if added:
+                logger.info(f"Face index synced: +{added} embeddings ({len(self)} total)")
+            return added
+
+    async def _full_sync(self, users_collection, batch_size: int) -> int:
+        # Legacy float lists and packed binary embeddings, but not empty lists
+        cursor = users_collection.find(
+            {"face_embedding": {"$exists": True, "$nin": [None, []]}},
+            {"_id": 0, "id": 1, "face_embedding": 1, "created_at": 1}
+        ).sort("created_at", 1).batch_size(batch_size)
+        added = 0
+        async for user in cursor:
+            if self.add(user["id"], user["face_embedding"]):
+                added += 1
+            self._advance(user.get("created_at"))
+        if self._synced_until is None:
+            # Nothing indexed yet; start the window at the newest user of any kind
+            newest = await users_collection.find({}, {"_id": 0, "created_at": 1}).sort(
+                "created_at", -1).limit(1).to_list(1)
+            self._synced_until = (newest[0].get("created_at") if newest else None) or ""
+        return added
+
+    async def _incremental_sync(self, users_collection, batch_size: int) -> int:
+        # Ids only (served by the created_at, id index); embeddings are fetched for new ids
+        since = self._window_start()
+        cursor = users_collection.find(
+            {"created_at": {"$gte": since}}, {"_id": 0, "id": 1, "created_at": 1}
+        ).sort("created_at", 1).batch_size(batch_size)
+        unseen: Dict[str, str] = {}
+        async for user in cursor:
+            if user["id"] not in self._known_ids and user["id"] not in self._faceless:
+                unseen[user["id"]] = user.get("created_at") or ""
+            self._advance(user.get("created_at"))
+
+        added = 0
+        ids = list(unseen)
+        for start in range(0, len(ids), batch_size):
+            async for user in users_collection.find(
+                {"id": {"$in": ids[start:start + batch_size]}}, {"_id": 0, "id": 1, "face_embedding": 1}
+            ):
+                if self.add(user["id"], user.get("face_embedding")):
+                    added += 1
+                    unseen.pop(user["id"], None)
+        self._faceless.update(unseen)
+        since = self._window_start()
+        self._faceless = {user_id: created for user_id, created in self._faceless.items() if created >= since}
+        return added
+
+    def _advance(self, created_at: Optional[str]):
+        if created_at and (self._synced_until is None or created_at > self._synced_until):
+            self._synced_until = created_at
+
+    def _window_start(self) -> str:
+        """created_at the lookback window starts at (ISO-8601 strings compare in time order)"""
+        try:
+            high_water = datetime.fromisoformat(self._synced_until)
+        except (TypeError, ValueError):
+            return ""
+        return (high_water - timedelta(seconds=self.lookback_seconds)).isoformat()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self),
+            "shards": len(self._shards),
+            "shard_size": self.shard_size,
+            "memory_mapped": self.mmap_dir is not None,
+            "threshold": self.threshold,
+            "last_sync_at": self.last_sync_at
+        }
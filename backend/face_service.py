@@ -0,0 +1,385 @@
+"""
+Face inference service for the AI-Enhanced Voting System.
+
+DeepFace runs in a pool of worker processes so that embedding extraction
+never blocks the API event loop. Requests go through a bounded queue:
+when it is full the caller gets a 429, and every request has a timeout.
+
+The face detector is configurable (DeepFace detector backends such as
+"opencv", "ssd", "mtcnn", "retinaface"); an image the client already
+cropped to the face skips detection altogether ("skip").
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, List, Optional, Union
+
+import numpy as np
+from fastapi import HTTPException
+
+from tracing import Tracer
+
+logger = logging.getLogger(__name__)
+
+FACE_MODEL_NAME = 'Facenet'
+FACE_DETECTOR_BACKEND = 'opencv'
+# Detector for images that are already a face crop
+PRECROPPED = 'skip'
+WARMUP_IMAGE_SIZE = (224, 224)
+# A failed warm-up is retried with a fresh pool, waiting WARMUP_BACKOFF_SECONDS, then twice as long, ...
+WARMUP_ATTEMPTS = 3
+WARMUP_BACKOFF_SECONDS = 2.0
+
+# ==================== WORKER PROCESS ====================
+
+def _init_worker(model_name: str, detector_backend: str = FACE_DETECTOR_BACKEND):
+    """Load and warm the face model once when a worker process starts"""
+    from deepface import DeepFace
+    DeepFace.build_model(model_name)
+    # One dummy pass builds the detector and the model's inference graph up front
+    DeepFace.represent(
+        img_path=np.zeros((*WARMUP_IMAGE_SIZE, 3), dtype=np.uint8),
+        model_name=model_name,
+        detector_backend=detector_backend,
+        enforce_detection=False
+    )
+
+def _warm_probe() -> int:
+    """No-op task; returns only after the worker's initializer has finished"""
+    return os.getpid()
+
+def _represent(image_array: np.ndarray, model_name: str,
+               detector_backend: str = FACE_DETECTOR_BACKEND) -> List[float]:
+    """Extract a face embedding inside a worker process"""
+    from deepface import DeepFace
+    embedding_objs = DeepFace.represent(
+        img_path=image_array,
+        model_name=model_name,
+        detector_backend=detector_backend,
+        enforce_detection=True
+    )
+    # DeepFace.represent returns a list of dicts, access embedding properly
+    if isinstance(embedding_objs, list) and len(embedding_objs) > 0:
+        return list(embedding_objs[0]['embedding'])  # type: ignore
+    raise ValueError("No face detected")
+
+def _represent_batch(images: List[np.ndarray], model_name: str,
+                     detector_backends: Optional[List[str]] = None) -> List[Union[List[float], Exception]]:
+    """Detect faces per image, then embed all crops in one batched forward pass.
+
+    detector_backends gives each image's detector (default: FACE_DETECTOR_BACKEND).
+    Returns one entry per input image: the embedding, or the exception that image
+    raised (ValueError where no face was found), so one bad image fails only itself.
+    """
+    from deepface import DeepFace
+    from deepface.modules import preprocessing
+
+    model = DeepFace.build_model(model_name)
+    target_size = model.input_shape
+
+    results: List[Union[List[float], Exception]] = [ValueError("No face detected")] * len(images)
+    crops = []
+    owners = []
+    detector_backends = detector_backends or [FACE_DETECTOR_BACKEND] * len(images)
+    for index, (image_array, detector_backend) in enumerate(zip(images, detector_backends)):
+        try:
+            faces = DeepFace.extract_faces(
+                img_path=image_array, detector_backend=detector_backend, enforce_detection=True
+            )
+            # Same preprocessing as DeepFace.represent: BGR, padded resize, base normalization
+            face = faces[0]['face'][:, :, ::-1]
+            face = preprocessing.resize_image(img=face, target_size=(target_size[1], target_size[0]))
+            crops.append(preprocessing.normalize_input(img=face, normalization='base'))
+            owners.append(index)
+        except ValueError as e:
+            results[index] = e
+        except Exception as e:
+            # Re-raised in the API process, so keep it to a type that always pickles
+            results[index] = RuntimeError(f"{type(e).__name__}: {e}")
+
+    if not crops:
+        return results
+
+    batch = np.concatenate(crops, axis=0)
+    embeddings = np.asarray(model.model(batch, training=False))
+    for index, embedding in zip(owners, embeddings):
+        results[index] = embedding.tolist()
+    return results
+
+# ==================== SERVICE ====================
+
+def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    values = np.fromiter(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "avg": round(float(values.mean()), 2),
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2)
+    }
+
+class FaceInferenceService:
+    """Bounded async front-end for a process pool running DeepFace.
+
+    Concurrent requests are micro-batched: a dispatcher waits up to
+    max_batch_wait_ms after the first queued image for up to max_batch_size
+    images and embeds them in a single worker call.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 32, timeout: float = 10.0,
+                 model_name: str = FACE_MODEL_NAME, max_batch_size: int = 8,
+                 max_batch_wait_ms: float = 5.0, detector_backend: str = FACE_DETECTOR_BACKEND,
+                 tracer: Optional[Tracer] = None):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.timeout = timeout
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_wait = max(0.0, max_batch_wait_ms) / 1000
+        self.detector_backend = detector_backend
+        self.tracer = tracer
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._warm_task: Optional[asyncio.Task] = None
+        self._in_flight = 0
+        # Set while a crashed pool is being replaced; requests get a 503 until it is warm
+        self._recovering = False
+
+        self.ready = False
+        self.model_load_seconds: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+
+        self._counters = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0, "precropped": 0,
+                          "pool_restarts": 0}
+        self._inference_ms: Deque[float] = deque(maxlen=1000)
+        self._wait_ms: Deque[float] = deque(maxlen=1000)
+        self._batch_sizes: Deque[int] = deque(maxlen=1000)
+
+    async def start(self):
+        """Spawn the worker pool and the queue dispatchers, then warm the workers in the background"""
+        if self._executor is not None:
+            return
+        self._executor = self._create_executor()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.workers)
+        ]
+        self._warm_task = asyncio.create_task(self._warm_up())
+        logger.info(f"OK: Face inference pool started ({self.workers} workers, queue {self.queue_size})")
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # TensorFlow does not survive fork() well, always spawn fresh interpreters
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.detector_backend)
+        )
+
+    def _restart_pool(self, broken: ProcessPoolExecutor):
+        """Replace a pool whose worker died (e.g. OOM-killed) and warm the new one"""
+        if broken is not self._executor:
+            # Another dispatcher has already replaced it
+            return
+        logger.error("ERROR: Face inference worker died, restarting the pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.ready = False
+        self._recovering = True
+        self._counters["pool_restarts"] += 1
+        self._executor = self._create_executor()
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+        self._warm_task = asyncio.create_task(self._warm_up())
+
+    async def _warm_up(self):
+        """Start every worker process and wait until each has loaded the model.
+
+        A pool that breaks while warming is replaced and retried with backoff. If
+        every attempt fails, requests are let through again (ready stays False)
+        so the pool gets another chance instead of a permanent 503.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, WARMUP_ATTEMPTS + 1):
+            started_at = time.perf_counter()
+            try:
+                # Submitting one probe per worker at once makes the pool spawn all of them
+                await asyncio.gather(*[
+                    loop.run_in_executor(self._executor, _warm_probe) for _ in range(self.workers)
+                ])
+                break
+            except Exception as e:
+                self.warmup_error = str(e)
+                if attempt == WARMUP_ATTEMPTS:
+                    logger.error(f"ERROR: Face model warm-up failed after {attempt} attempts: {e}")
+                    self._recovering = False
+                    return
+                logger.warning(f"Face model warm-up failed (attempt {attempt}/{WARMUP_ATTEMPTS}), retrying: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._counters["pool_restarts"] += 1
+                    self._executor = self._create_executor()
+                await asyncio.sleep(WARMUP_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        self.model_load_seconds = round(time.perf_counter() - started_at, 3)
+        self.warmup_error = None
+        self._recovering = False
+        self.ready = True
+        logger.info(f"OK: Face model '{self.model_name}' warm in {self.model_load_seconds}s")
+
+    async def wait_ready(self) -> bool:
+        """Wait for the warm-up in progress (if any) to finish; True if the model is loaded"""
+        # A pool restart replaces the warm-up task, so keep following the current one
+        while not self.ready and self._warm_task is not None and not self._warm_task.done():
+            await asyncio.wait({self._warm_task})
+        return self.ready
+
+    async def stop(self):
+        """Cancel dispatchers and shut the worker pool down"""
+        tasks = self._dispatchers + ([self._warm_task] if self._warm_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatchers = []
+        self._warm_task = None
+        self.ready = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._queue = None
+
+    async def represent(self, image_array: np.ndarray, cropped: bool = False) -> List[float]:
+        """Queue an image for embedding extraction and wait for the result.
+
+        cropped=True: the image is already the face, so detection is skipped.
+        """
+        if self._queue is None or self._recovering:
+            raise HTTPException(status_code=503, detail="Face verification service unavailable")
+        detector_backend = PRECROPPED if cropped else self.detector_backend
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Filled in by the dispatcher: [seconds queued, seconds in the worker]
+        timing = [0.0, 0.0]
+        try:
+            self._queue.put_nowait((image_array, detector_backend, future, time.perf_counter(), timing))
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            logger.warning("Face inference queue full, rejecting request")
+            raise HTTPException(status_code=429, detail="Face verification is busy. Please retry shortly.")
+
+        try:
+            embedding = await asyncio.wait_for(future, timeout=self.timeout)
+            if self.tracer is not None:
+                self.tracer.record("face_queue", timing[0])
+                self.tracer.record("face_inference", timing[1])
+            return embedding
+        except asyncio.TimeoutError:
+            self._counters["timed_out"] += 1
+            logger.warning(f"Face inference timed out after {self.timeout}s")
+            raise HTTPException(status_code=504, detail="Face verification timed out. Please try again.")
+        except HTTPException:
+            raise
+        except BrokenProcessPool:
+            raise HTTPException(status_code=503, detail="Face verification service unavailable")
+        except Exception as e:
+            logger.error(f"Error extracting face embedding: {e}")
+            raise HTTPException(status_code=400, detail="Could not detect face in image")
+
+    async def _next_batch(self) -> list:
+        """Wait for one queued image, then gather more until the batch is full or the window closes"""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_batch_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch(self):
+        """Move queued images into the process pool in micro-batches"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            try:
+                # Callers may already have timed out while waiting in the queue
+                live = [item for item in batch if not item[2].done()]
+                if not live:
+                    continue
+                started_at = time.perf_counter()
+                for _, detector_backend, _, enqueued_at, timing in live:
+                    if detector_backend == PRECROPPED:
+                        self._counters["precropped"] += 1
+                    timing[0] = started_at - enqueued_at
+                    self._wait_ms.append(timing[0] * 1000)
+                self._in_flight += len(live)
+                executor = self._executor
+                try:
+                    if len(live) == 1:
+                        results = [await loop.run_in_executor(
+                            executor, _represent, live[0][0], self.model_name, live[0][1]
+                        )]
+                    else:
+                        results = await loop.run_in_executor(
+                            executor, _represent_batch, [item[0] for item in live], self.model_name,
+                            [item[1] for item in live]
+                        )
+                except Exception as e:
+                    self._counters["failed"] += len(live)
+                    if isinstance(e, BrokenProcessPool):
+                        self._restart_pool(executor)
+                    for _, _, future, _, _ in live:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                finally:
+                    self._in_flight -= len(live)
+
+                elapsed = time.perf_counter() - started_at
+                self._batch_sizes.append(len(live))
+                for (_, _, future, _, timing), embedding in zip(live, results):
+                    timing[1] = elapsed
+                    self._inference_ms.append(elapsed * 1000)
+                    if isinstance(embedding, Exception):
+                        self._counters["failed"] += 1
+                        if not future.done():
+                            future.set_exception(embedding)
+                    else:
+                        self._counters["completed"] += 1
+                        if not future.done():
+                            future.set_result(embedding)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, counters and latency percentiles"""
+        return {
+            "model": self.model_name,
+            "detector_backend": self.detector_backend,
+            "ready": self.ready,
+            "model_load_seconds": self.model_load_seconds,
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.queue_size,
+            "in_flight": self._in_flight,
+            "timeout_seconds": self.timeout,
+            "max_batch_size": self.max_batch_size,
+            "max_batch_wait_ms": self.max_batch_wait * 1000,
+            "avg_batch_size": round(sum(self._batch_sizes) / len(self._batch_sizes), 2) if self._batch_sizes else 0.0,
+            **self._counters,
+            "queue_wait_ms": _percentiles(self._wait_ms),
+            "inference_ms": _percentiles(self._inference_ms)
+        }
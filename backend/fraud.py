@@ -0,0 +1,325 @@
+"""
+Background fraud scoring for the AI-Enhanced Voting System.
+
+An Isolation Forest is refit periodically on a bounded sample of votes
+(streamed from MongoDB in batches) and persisted to disk. New votes are
+scored incrementally as they arrive; each vote gets fraud_score and
+is_anomaly fields so the admin endpoint is a cheap indexed query. Every
+API worker runs the loop, but only the holder of a lease in MongoDB trains,
+writes the model file and scores; the others stand by to take over. Features
+that look at neighbouring votes read them from the database, so training
+and incremental scoring see the same values whatever the batch boundaries.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from sklearn.ensemble import IsolationForest
+
+logger = logging.getLogger(__name__)
+
+# Bump when the feature set changes; persisted models of another version are discarded
+FEATURE_VERSION = 3
+FEATURE_NAMES = [
+    "hour_sin",                   # time of day, cyclic
+    "hour_cos",
+    "seconds_since_user_prev",    # gap to the same user's previous vote
+    "election_votes_per_minute",  # votes in the vote's election over the trailing minute
+    "login_to_vote_seconds",      # vote time minus token issue time, -1 if unknown
+    "face_margin",                # threshold minus face distance, 0 if not verified
+    "face_verified"
+]
+FEATURE_COLUMNS = ["user_id", "election_id", "timestamp", "auth_at", "face_margin"]
+FEATURE_PROJECTION = {"_id": 1, **{column: 1 for column in FEATURE_COLUMNS}}
+CONTEXT_PROJECTION = {"_id": 1, "user_id": 1, "election_id": 1, "timestamp": 1}
+
+LEASE_ID = "fraud_scorer"
+
+# Cap for "no previous vote" so it doesn't dominate the tree splits
+NO_PREVIOUS_GAP_SECONDS = 7 * 24 * 3600.0
+RATE_WINDOW_SECONDS = 60
+
+def _utc_seconds(values: List[str]) -> np.ndarray:
+    """Epoch seconds for ISO-8601 UTC strings as written by the API; NaN for empty strings"""
+    # The first 19 characters are the UTC wall-clock time "YYYY-MM-DDTHH:MM:SS";
+    # decode their digits as a uint8 matrix instead of parsing strings one by one
+    raw = np.array(values, dtype="S19")
+    missing = raw == b""
+    chars = raw.view(np.uint8).reshape(-1, 19)
+
+    def field(start: int, end: int) -> np.ndarray:
+        number = (chars[:, start] - ord('0')).astype(np.int64)
+        for column in range(start + 1, end):
+            number = number * 10 + (chars[:, column] - ord('0'))
+        return number
+
+    months = (field(0, 4) - 1970) * 12 + field(5, 7) - 1
+    days = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) + field(8, 10) - 1
+    seconds = (days * 86400 + field(11, 13) * 3600 + field(14, 16) * 60 + field(17, 19)).astype(np.float64)
+    seconds[missing] = np.nan
+    return seconds
+
+def _group_keys(values: List[Any], sort: bool = False) -> np.ndarray:
+    """Small integer codes for equal ids (in value order with sort=True)"""
+    # Hash-based; np.unique on string arrays sorts them, which is far slower
+    return pd.factorize(pd.Series(values, dtype=object), sort=sort)[0].astype(np.int64)
+
+def build_features(votes: List[Dict[str, Any]], context: List[Dict[str, Any]] = ()) -> np.ndarray:
+    """Vectorized feature matrix (len(votes) x len(FEATURE_NAMES)) for a batch of votes.
+
+    context holds other stored votes (see FraudScorer.load_context) that count
+    towards the gap and rate features but get no row, so a vote's features
+    don't depend on which batch it was scored in.
+    """
+    if not votes:
+        return np.empty((0, len(FEATURE_NAMES)), dtype=np.float64)
+    if context:
+        batch_ids = {v["_id"] for v in votes if "_id" in v}
+        context = [c for c in context if c.get("_id") not in batch_ids]
+    rows = len(votes)
+    every = list(votes) + list(context)
+
+    # Column-wise view of the batch plus its context; everything after this is array maths
+    seconds = _utc_seconds([v["timestamp"] for v in every])
+    authed_at = _utc_seconds([v.get("auth_at") or "" for v in votes])
+    face_margin = np.array([v.get("face_margin") for v in votes], dtype=np.float64)
+    user_codes = _group_keys([v["user_id"] for v in every])
+    election_codes = _group_keys([v["election_id"] for v in every])
+
+    hour_angle = 2 * np.pi * (seconds[:rows] % 86400) / 86400
+
+    # Sort by (user, time, _id), diff neighbours, and blank the first vote of every user;
+    # _id settles ties so equal timestamps get the same gaps in any batch. Ties are rare,
+    # so only the tied votes' ids are looked at
+    order = np.lexsort((seconds, user_codes))
+    sorted_users, sorted_seconds = user_codes[order], seconds[order]
+    tied = (sorted_users[1:] == sorted_users[:-1]) & (sorted_seconds[1:] == sorted_seconds[:-1])
+    if tied.any():
+        tied_rows = np.unique(np.concatenate([order[1:][tied], order[:-1][tied]]))
+        tiebreak = np.zeros(len(every), dtype=np.int64)
+        tiebreak[tied_rows] = _group_keys([str(every[i].get("_id", "")) for i in tied_rows], sort=True)
+        order = np.lexsort((tiebreak, seconds, user_codes))
+    sorted_gaps = np.diff(seconds[order], prepend=np.nan)
+    sorted_gaps[1:][user_codes[order][1:] != user_codes[order][:-1]] = np.nan
+    gap = np.empty_like(sorted_gaps)
+    gap[order] = sorted_gaps
+    gap = np.nan_to_num(gap[:rows], nan=NO_PREVIOUS_GAP_SECONDS).clip(max=NO_PREVIOUS_GAP_SECONDS)
+
+    # Votes in the same election within (t - 60s, t], counted on sorted (election, time) keys
+    # (looking up the keys in sorted order is cache friendly, then the counts are scattered back)
+    keys = election_codes * (1 << 34) + seconds.astype(np.int64)
+    key_order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[key_order]
+    sorted_rate = (np.searchsorted(sorted_keys, sorted_keys, side="right")
+                   - np.searchsorted(sorted_keys, sorted_keys - RATE_WINDOW_SECONDS, side="right"))
+    rate = np.empty_like(sorted_rate)
+    rate[key_order] = sorted_rate
+    rate = rate[:rows]
+
+    login_to_vote = np.nan_to_num(seconds[:rows] - authed_at, nan=-1.0)
+
+    return np.column_stack([
+        np.sin(hour_angle),
+        np.cos(hour_angle),
+        gap,
+        rate,
+        login_to_vote,
+        np.nan_to_num(face_margin, nan=0.0),
+        ~np.isnan(face_margin)
+    ]).astype(np.float64)
+
+class FraudScorer:
+    """Periodically refit Isolation Forest that scores votes incrementally"""
+
+    def __init__(self, model_path: Path, contamination: float = 0.1, batch_size: int = 5000,
+                 fit_sample: int = 100000, min_votes: int = 10, lease_seconds: float = 300.0):
+        self.model_path = Path(model_path)
+        self.contamination = contamination
+        self.batch_size = batch_size
+        self.fit_sample = fit_sample
+        self.min_votes = min_votes
+        self.lease_seconds = lease_seconds
+        self.worker_id = str(uuid.uuid4())
+        self.leader = False
+
+        self.model: Optional[IsolationForest] = None
+        self.model_version: Optional[str] = None
+        self.trained_on = 0
+        self.scored = 0
+        self.last_refit_at: Optional[float] = None
+
+    def load(self) -> bool:
+        """Load the persisted model, if there is one"""
+        if not self.model_path.exists():
+            return False
+        try:
+            saved = joblib.load(self.model_path)
+            if saved.get("feature_version") != FEATURE_VERSION:
+                logger.info("Persisted fraud model uses an older feature set, will retrain")
+                return False
+            self.model = saved["model"]
+            self.model_version = saved["version"]
+            self.trained_on = saved["trained_on"]
+            # Count the model's age from when it was written, so a restart doesn't force a refit
+            self.last_refit_at = time.monotonic() - max(0.0, time.time() - self.model_path.stat().st_mtime)
+            logger.info(f"OK: Fraud model {self.model_version} loaded ({self.trained_on} votes)")
+            return True
+        except Exception as e:
+            logger.error(f"Could not load fraud model from {self.model_path}: {e}")
+            return False
+
+    async def load_context(self, votes_collection, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Stored votes the batch's gap and rate features depend on: earlier votes by
+        the same users, and votes in the same elections during the trailing minute"""
+        if not batch:
+            return []
+        timestamps = [v["timestamp"] for v in batch]
+        latest = max(timestamps)
+        # ISO-8601 strings in one format compare like the times they encode
+        window_start = (datetime.fromisoformat(min(timestamps))
+                        - timedelta(seconds=RATE_WINDOW_SECONDS + 1)).isoformat()
+        users = list({v["user_id"] for v in batch})
+        elections = list({v["election_id"] for v in batch})
+        cursor = votes_collection.find({"$or": [
+            {"user_id": {"$in": users}, "timestamp": {"$lte": latest}},
+            {"election_id": {"$in": elections}, "timestamp": {"$gte": window_start, "$lte": latest}}
+        ]}, CONTEXT_PROJECTION).batch_size(self.batch_size)
+        return [vote async for vote in cursor]
+
+    async def features(self, votes_collection, batch: List[Dict[str, Any]]) -> np.ndarray:
+        return build_features(batch, await self.load_context(votes_collection, batch))
+
+    async def refit(self, votes_collection) -> bool:
+        """Train a fresh model on the most recent fit_sample votes and persist it"""
+        batches = []
+        cursor = votes_collection.find({}, FEATURE_PROJECTION).sort("_id", -1).limit(self.fit_sample)
+        cursor = cursor.batch_size(self.batch_size)
+        batch = []
+        async for vote in cursor:
+            batch.append(vote)
+            if len(batch) >= self.batch_size:
+                batches.append(await self.features(votes_collection, batch))
+                batch = []
+        if batch:
+            batches.append(await self.features(votes_collection, batch))
+
+        trained_on = sum(len(b) for b in batches)
+        if trained_on < self.min_votes:
+            return False
+
+        features = np.concatenate(batches)
+        model = IsolationForest(contamination=self.contamination, random_state=42)
+        await asyncio.to_thread(model.fit, features)
+
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.model_path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(
+            joblib.dump,
+            {"model": model, "version": version, "trained_on": trained_on, "feature_version": FEATURE_VERSION},
+            self.model_path
+        )
+        self.model, self.model_version, self.trained_on = model, version, trained_on
+        self.last_refit_at = time.monotonic()
+        logger.info(f"OK: Fraud model {version} trained on {trained_on} votes")
+        return True
+
+    async def score_pending(self, votes_collection) -> int:
+        """Score votes that have no fraud_score yet, one batch at a time"""
+        if self.model is None:
+            return 0
+        scored = 0
+        while True:
+            # fraud_score: None matches missing fields and is answered by the fraud_score index
+            batch = await votes_collection.find(
+                {"fraud_score": None}, FEATURE_PROJECTION
+            ).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                break
+
+            features = await self.features(votes_collection, batch)
+            scores = await asyncio.to_thread(self.model.decision_function, features)
+            # Same cut-off as IsolationForest.predict: negative decision values are outliers
+            updates = [
+                UpdateOne(
+                    {"_id": vote["_id"]},
+                    {"$set": {
+                        "fraud_score": float(score),
+                        "is_anomaly": bool(score < 0),
+                        "fraud_model_version": self.model_version
+                    }}
+                )
+                for vote, score in zip(batch, scores)
+            ]
+            await votes_collection.bulk_write(updates, ordered=False)
+            scored += len(batch)
+            if len(batch) < self.batch_size:
+                break
+        self.scored += scored
+        return scored
+
+    async def _hold_lease(self, leases) -> bool:
+        """Claim the scoring lease, or renew it if this worker holds it already"""
+        now = datetime.now(timezone.utc)
+        try:
+            await leases.find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"holder": self.worker_id}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": self.worker_id, "expires_at": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # The lease document exists and another worker holds it
+            return False
+
+    async def run(self, votes_collection, score_interval: float, refit_interval: float, leases=None):
+        """Background loop: refit when due, then score whatever arrived since last pass.
+
+        With a leases collection only the worker holding the lease does the work;
+        the lease is renewed every pass and taken over once it expires.
+        """
+        if leases is None:
+            self.leader = True
+            self.load()
+        while True:
+            try:
+                if leases is not None:
+                    leader = await self._hold_lease(leases)
+                    if leader != self.leader:
+                        logger.info(f"Fraud scoring {'taken over by' if leader else 'handed off from'} this worker")
+                        self.leader = leader
+                        if leader and self.model is None:
+                            self.load()
+                    if not leader:
+                        await asyncio.sleep(score_interval)
+                        continue
+                refit_due = self.last_refit_at is None or time.monotonic() - self.last_refit_at >= refit_interval
+                if self.model is None or refit_due:
+                    if not await self.refit(votes_collection) and self.model is not None:
+                        # Not enough votes yet; keep the loaded model and retry later
+                        self.last_refit_at = time.monotonic()
+                scored = await self.score_pending(votes_collection)
+                if scored:
+                    logger.info(f"Fraud scoring: {scored} new votes scored")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in fraud scoring: {e}")
+            await asyncio.sleep(score_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_version": self.model_version,
+            "leader": self.leader,
+            "trained_on": self.trained_on,
+            "scored_since_start": self.scored
+        }
@@ -0,0 +1,200 @@
+"""
+Index Manifest for AI-Enhanced Voting System
+Declares every index the API's queries rely on; applied at startup by server.py
+
+Usage (from the backend directory):
+    python indexes.py apply               # create missing indexes
+    python indexes.py verify [--explain]  # report missing indexes (and collection scans)
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+# Index names are left to MongoDB's defaults (e.g. "email_1") so re-applying the
+# manifest over indexes created by older releases is a no-op
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("aadhaar", ASCENDING)], unique=True),
+        IndexModel([("id", ASCENDING)], unique=True),
+        # Admin voter listing walks this newest first
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+        # Admin voter search by name prefix (email prefixes use the email index)
+        IndexModel([("name", ASCENDING)]),
+    ],
+    "admins": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "elections": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("status", ASCENDING)]),
+    ],
+    "candidates": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("election_id", ASCENDING), ("id", ASCENDING)]),
+    ],
+    "votes": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("election_id", ASCENDING), ("candidate_id", ASCENDING)]),
+        # Fraud scores: pending votes are found by fraud_score == null, reports by is_anomaly
+        IndexModel([("fraud_score", ASCENDING)]),
+        IndexModel([("is_anomaly", ASCENDING), ("fraud_score", ASCENDING)]),
+        # Fraud features: a user's earlier votes and an election's recent votes
+        IndexModel([("user_id", ASCENDING), ("timestamp", ASCENDING)]),
+        IndexModel([("election_id", ASCENDING), ("timestamp", ASCENDING)]),
+    ],
+    "vote_counters": [
+        # Unique per shard so concurrent upserts can't duplicate a counter
+        IndexModel([("election_id", ASCENDING), ("candidate_id", ASCENDING), ("shard", ASCENDING)], unique=True),
+    ],
+    "notifications": [
+        IndexModel([("id", ASCENDING)]),
+        # Outbox workers look for due messages and their own claims
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+        # ... and for claims left behind by a worker that died mid-send
+        IndexModel([("status", ASCENDING), ("claimed_at", ASCENDING)]),
+        IndexModel([("claim_id", ASCENDING)], sparse=True),
+        # Delivered messages are kept for a week
+        IndexModel([("sent_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600),
+    ],
+}
+
+# The filters and sorts the API actually sends, for the explain-plan check.
+# (label, collection, filter, sort)
+QUERY_SHAPES: List[Tuple[str, str, Dict[str, Any], List[Tuple[str, int]]]] = [
+    ("register: email taken", "users", {"email": "voter@example.com"}, []),
+    ("register: aadhaar taken", "users", {"aadhaar": "123456789012"}, []),
+    ("login", "users", {"email": "voter@example.com"}, []),
+    ("vote: user", "users", {"id": "user-id"}, []),
+    ("bulk import: taken", "users",
+     {"$or": [{"email": {"$in": ["a@example.com", "b@example.com"]}}, {"aadhaar": {"$in": ["123456789012"]}}]}, []),
+    ("vote: mark voted", "users", {"id": "user-id", "voted_elections": {"$ne": "election-id"}}, []),
+    ("admin voters page", "users", {}, [("created_at", -1), ("id", -1)]),
+    ("admin voters search", "users", {"$or": [{"email": {"$regex": "^alice"}}, {"name": {"$regex": "^alice"}}]},
+     [("created_at", -1), ("id", -1)]),
+    ("face index: recent ids", "users", {"created_at": {"$gte": "2030-01-01T00:00:00+00:00"}}, [("created_at", 1)]),
+    ("admin login", "admins", {"email": "admin@voting.gov.in"}, []),
+    ("election by id", "elections", {"id": "election-id"}, []),
+    ("active elections", "elections", {"status": "active"}, []),
+    ("election candidates", "candidates", {"election_id": "election-id"}, []),
+    ("delete candidate", "candidates", {"id": "candidate-id"}, []),
+    ("vote rollback", "votes", {"id": "vote-id"}, []),
+    ("candidate votes", "votes", {"election_id": "election-id", "candidate_id": "candidate-id"}, []),
+    ("fraud: pending", "votes", {"fraud_score": None}, []),
+    ("fraud: user history", "votes", {"user_id": {"$in": ["user-id"]}, "timestamp": {"$lte": "2030-01-01T00:00:00+00:00"}}, []),
+    ("fraud: election window", "votes",
+     {"election_id": {"$in": ["election-id"]},
+      "timestamp": {"$gte": "2030-01-01T00:00:00+00:00", "$lte": "2030-01-01T00:01:00+00:00"}}, []),
+    ("fraud: anomalies", "votes", {"is_anomaly": True}, [("fraud_score", 1)]),
+    ("vote totals", "vote_counters", {"election_id": "election-id"}, []),
+    ("outbox: due", "notifications",
+     {"$or": [{"status": "pending", "next_attempt_at": {"$lte": datetime(2030, 1, 1)}},
+              {"status": "sending", "claimed_at": {"$lt": datetime(2030, 1, 1)}}]},
+     [("next_attempt_at", 1)]),
+    ("outbox: claimed", "notifications", {"claim_id": "claim-id"}, []),
+]
+
+def _key_spec(index: Dict[str, Any]) -> Tuple:
+    return tuple((field, int(direction)) for field, direction in index["key"].items())
+
+async def ensure_indexes(db) -> int:
+    """Create every manifest index that is missing; returns how many collections failed"""
+    failures = 0
+    for collection, models in INDEXES.items():
+        try:
+            await db[collection].create_indexes(models)
+        except Exception as e:
+            # e.g. duplicate emails already stored; the other collections still get their indexes
+            failures += 1
+            logger.error(f"Could not create indexes on {collection}: {e}")
+    return failures
+
+async def verify_indexes(db) -> List[str]:
+    """Manifest indexes that are absent or differ in uniqueness, as readable strings"""
+    problems = []
+    for collection, models in INDEXES.items():
+        existing = {
+            _key_spec(index): bool(index.get("unique"))
+            async for index in db[collection].list_indexes()
+        }
+        for model in models:
+            spec = _key_spec(model.document)
+            unique = bool(model.document.get("unique"))
+            if spec not in existing:
+                problems.append(f"{collection}: missing {model.document['name']}")
+            elif existing[spec] != unique:
+                problems.append(f"{collection}: {model.document['name']} should{'' if unique else ' not'} be unique")
+    return problems
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage", "")]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages.extend(_plan_stages(child))
+    return stages
+
+async def explain_queries(db) -> List[Tuple[str, List[str]]]:
+    """Winning-plan stages for every query shape; a COLLSCAN means an unindexed endpoint query"""
+    results = []
+    for label, collection, query, sort in QUERY_SHAPES:
+        command = {"find": collection, "filter": query}
+        if sort:
+            command["sort"] = dict(sort)
+        explained = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        planner = explained["queryPlanner"]
+        # Newer servers wrap the classic plan in a slot-based engine plan
+        winning = planner["winningPlan"].get("queryPlan", planner["winningPlan"])
+        results.append((label, _plan_stages(winning)))
+    return results
+
+async def main(command: str, explain: bool) -> int:
+    load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=True)
+    client = AsyncIOMotorClient(os.getenv("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.getenv("DB_NAME", "smartballot")]
+
+    try:
+        await db.command('ping')
+        print("✓ Connected to MongoDB")
+
+        if command == "apply":
+            failures = await ensure_indexes(db)
+            print("✓ Indexes applied" if not failures else f"✗ {failures} collection(s) failed, see log")
+            if failures:
+                return 1
+
+        problems = await verify_indexes(db)
+        for problem in problems:
+            print(f"✗ {problem}")
+        if not problems:
+            print(f"✓ All {sum(len(m) for m in INDEXES.values())} manifest indexes present")
+
+        if explain:
+            for label, stages in await explain_queries(db):
+                mark = "✗" if "COLLSCAN" in stages else "✓"
+                if mark == "✗":
+                    problems.append(f"{label}: collection scan")
+                print(f"{mark} {label:<26} {' <- '.join(stages)}")
+
+        return 1 if problems else 0
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply or verify the MongoDB index manifest")
+    parser.add_argument("command", choices=["apply", "verify"])
+    parser.add_argument("--explain", action="store_true", help="Also check every API query shape is index-backed")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main(args.command, args.explain)))
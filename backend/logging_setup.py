@@ -0,0 +1,170 @@
+"""
+Logging setup for the AI-Enhanced Voting System.
+
+Request handlers never write log output themselves: records go through a
+bounded in-memory queue (QueueHandler) and a listener thread does the
+formatting and I/O, so a slow terminal or log driver cannot stall the event
+loop. Before a record is queued it passes two cheap filters:
+  - rate limiting: each call site may log `rate_limit` records per second
+    (bursts up to `burst`); the rest are counted and reported on the next
+    record that gets through. Warnings and errors (failed logins, duplicate
+    faces and other security events) are never limited, nor is the access
+    log, which is one line per request by design.
+  - sampling: a call site can pass extra={"sample_rate": 0.01} to keep
+    only that fraction of its records.
+If the queue is full the record is dropped and counted, never waited on.
+
+Output is either the usual text lines or one JSON object per line.
+"""
+
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+# Attributes every LogRecord has; anything else came in through extra= and goes into the JSON
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+TEXT_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+
+class TextFormatter(logging.Formatter):
+    """The usual level:logger:message line, noting how many similar records were rate limited"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{line} [{suppressed} similar suppressed]" if suppressed else line
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message, extra fields, exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and key != "sample_rate":
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+# Loggers whose records are never rate limited
+UNLIMITED_LOGGERS = ("uvicorn.access",)
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site (logger, file, line) for records below WARNING, plus opt-in sampling"""
+
+    def __init__(self, rate_limit: float = 20.0, burst: int = 50,
+                 unlimited_loggers: Tuple[str, ...] = UNLIMITED_LOGGERS):
+        super().__init__()
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.unlimited_loggers = frozenset(unlimited_loggers)
+        # call site -> [tokens, last refill time, suppressed since last pass]
+        self._buckets: Dict[Tuple[str, str, int], list] = {}
+        self.suppressed = 0
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate = getattr(record, "sample_rate", None)
+        if sample_rate is not None and random.random() >= sample_rate:
+            self.sampled_out += 1
+            return False
+        if record.levelno >= logging.WARNING or self.rate_limit <= 0 or record.name in self.unlimited_loggers:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now, 0]
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_limit)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            self.suppressed += 1
+            return False
+        bucket[0] -= 1
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full instead of blocking"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogPipeline:
+    """The installed queue handler, its filter and the listener thread"""
+
+    def __init__(self, handler: DroppingQueueHandler, rate_filter: RateLimitFilter,
+                 listener: logging.handlers.QueueListener):
+        self.handler = handler
+        self.rate_filter = rate_filter
+        self.listener = listener
+
+    def stop(self):
+        """Flush what is queued and stop the listener thread"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "rate_limited": self.rate_filter.suppressed,
+            "sampled_out": self.rate_filter.sampled_out
+        }
+
+def configure_logging(level: str = "INFO", fmt: str = "text", queue_size: int = 10000,
+                      rate_limit: float = 20.0, burst: int = 50, stream=None,
+                      capture_uvicorn: bool = True) -> LogPipeline:
+    """Route the root logger (and uvicorn's) through a bounded queue to a listener thread"""
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter(TEXT_FORMAT))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    rate_filter = RateLimitFilter(rate_limit=rate_limit, burst=burst)
+    handler.addFilter(rate_filter)
+    listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=False)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    if capture_uvicorn:
+        # uvicorn installs its own synchronous stdout handlers before importing the app;
+        # the access log writes a line per request, so send it through the queue as well
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+    listener.start()
+    return LogPipeline(handler, rate_filter, listener)
+
+def sampled(rate: Optional[float]) -> Dict[str, float]:
+    """extra= for a high-frequency call site: keep only `rate` of its records"""
+    return {"sample_rate": rate} if rate is not None and rate < 1 else {}
@@ -0,0 +1,70 @@
+"""
+Embedding Migration Utility for AI-Enhanced Voting System
+Converts face_embedding float lists in the users collection to packed binary
+
+Usage (from the backend directory):
+    python migrate_embeddings.py [--dtype float32|float16] [--batch-size 1000] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from embeddings import encode_embedding, format_for_dtype
+
+# Load environment variables
+load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=True)
+
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+DB_NAME = os.getenv("DB_NAME", "smartballot")
+
+async def migrate_embeddings(dtype: str, batch_size: int, dry_run: bool):
+    """Rewrite every legacy list embedding as tagged binary, in bulk batches"""
+    fmt = format_for_dtype(dtype)
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+
+    try:
+        await db.command('ping')
+        print("✓ Connected to MongoDB")
+
+        # Only non-empty arrays; already-migrated binary values have no element 0
+        query = {"face_embedding.0": {"$exists": True}}
+        pending = await db.users.count_documents(query)
+        print(f"Found {pending} users with list embeddings (target: {dtype})")
+        if dry_run or pending == 0:
+            return
+
+        converted = 0
+        batch = []
+        cursor = db.users.find(query, {"_id": 1, "face_embedding": 1}).batch_size(batch_size)
+        async for user in cursor:
+            batch.append(UpdateOne(
+                {"_id": user["_id"], "face_embedding.0": {"$exists": True}},
+                {"$set": {"face_embedding": encode_embedding(user["face_embedding"], fmt)}}
+            ))
+            if len(batch) >= batch_size:
+                result = await db.users.bulk_write(batch, ordered=False)
+                converted += result.modified_count
+                batch = []
+                print(f"  ... {converted}/{pending}")
+        if batch:
+            result = await db.users.bulk_write(batch, ordered=False)
+            converted += result.modified_count
+
+        print(f"✓ Converted {converted} embeddings")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert face embeddings to packed binary storage")
+    parser.add_argument("--dtype", default=os.getenv("EMBEDDING_DTYPE", "float32"), choices=["float32", "float16"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Only count documents that need converting")
+    args = parser.parse_args()
+    asyncio.run(migrate_embeddings(args.dtype, args.batch_size, args.dry_run))
@@ -0,0 +1,270 @@
+"""
+Notification outbox for the AI-Enhanced Voting System.
+
+Request handlers never talk to a mail server. They insert the message into
+db.notifications and return. Background workers claim due messages in
+batches, deliver each batch through one sender call (one SMTP connection),
+and retry failures with exponential backoff and jitter. After max_attempts,
+or on a permanent (5xx) rejection, a message is marked failed.
+
+Claims are atomic, so every API worker can run the outbox side by side. A
+claim left behind by a crashed worker expires after claim_timeout. Delivery
+is therefore at-least-once.
+
+Senders:
+  LogSender   logs each message (the default, for development)
+  SmtpSender  smtplib in a thread, one connection per batch
+
+For local testing, an SMTP stand-in that prints every message it receives:
+    python notifications.py smtpd [--port 8025]        (needs aiosmtpd)
+then start the API with NOTIFY_BACKEND=smtp SMTP_HOST=localhost SMTP_PORT=8025
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import smtplib
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ["pending", "sending", "sent", "failed"]
+
+class DeliveryError(Exception):
+    """A message that could not be delivered; permanent ones are not retried"""
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+class LogSender:
+    """Development sender: logs every message instead of sending it"""
+
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[Optional[DeliveryError]]:
+        for message in messages:
+            logger.info("Mock email to %s: %s", message["to"], message["subject"],
+                        extra={"email_body": message["body"]})
+        return [None] * len(messages)
+
+def _is_permanent(error: smtplib.SMTPException) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+class SmtpSender:
+    """Sends a batch over a single SMTP connection, in a worker thread"""
+
+    def __init__(self, host: str, port: int = 25, sender: str = "no-reply@voting.gov.in",
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = False, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def _build(self, message: Dict[str, Any]) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message["to"]
+        email["Subject"] = message["subject"]
+        # Lets the receiving side drop the duplicate of an at-least-once redelivery
+        email["Message-ID"] = f"<{message['id']}@{self.sender.split('@')[-1]}>"
+        email.set_content(message["body"])
+        return email
+
+    def _send_batch(self, messages: List[Dict[str, Any]]) -> List[Optional[DeliveryError]]:
+        results: List[Optional[DeliveryError]] = []
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password or "")
+                for message in messages:
+                    try:
+                        smtp.send_message(self._build(message))
+                        results.append(None)
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                        results.append(DeliveryError(str(e), permanent=_is_permanent(e)))
+        except (OSError, smtplib.SMTPException) as e:
+            # Connection-level failure: whatever was not sent yet is retried
+            results.extend(DeliveryError(f"SMTP {self.host}:{self.port}: {e}") for _ in messages[len(results):])
+        return results
+
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[Optional[DeliveryError]]:
+        return await asyncio.to_thread(self._send_batch, messages)
+
+class NotificationOutbox:
+    """Durable outbox in MongoDB with batched, retrying delivery workers"""
+
+    def __init__(self, sender, collection: str = "notifications", workers: int = 2,
+                 batch_size: int = 20, max_attempts: int = 6, retry_base: float = 5.0,
+                 retry_max: float = 900.0, claim_timeout: float = 120.0, poll_interval: float = 5.0):
+        self.sender = sender
+        self.collection = collection
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self._wakeup: Optional[asyncio.Event] = None
+        self._counters = {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0, "batches": 0}
+
+    async def enqueue(self, db, to: str, subject: str, body: str, channel: str = "email") -> str:
+        """Store a message for delivery and return its id; delivery happens in the background"""
+        notification_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        await db[self.collection].insert_one({
+            "id": notification_id,
+            "channel": channel,
+            "to": to,
+            "subject": subject,
+            "body": body,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now.isoformat()
+        })
+        self._counters["enqueued"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return notification_id
+
+    def _due(self, now: datetime) -> Dict[str, Any]:
+        return {"$or": [
+            {"status": "pending", "next_attempt_at": {"$lte": now}},
+            {"status": "sending", "claimed_at": {"$lt": now - timedelta(seconds=self.claim_timeout)}}
+        ]}
+
+    async def _claim_batch(self, db) -> List[Dict[str, Any]]:
+        """Claim up to batch_size due messages in three round trips, whatever the batch size"""
+        now = datetime.now(timezone.utc)
+        due = self._due(now)
+        candidates = await db[self.collection].find(due, {"_id": 0, "id": 1}).sort(
+            "next_attempt_at", ASCENDING
+        ).limit(self.batch_size).to_list(self.batch_size)
+        if not candidates:
+            return []
+        claim_id = str(uuid.uuid4())
+        # The filter re-checks the due condition, so a message another worker took is skipped
+        await db[self.collection].update_many(
+            {"$and": [{"id": {"$in": [c["id"] for c in candidates]}}, due]},
+            {"$set": {"status": "sending", "claimed_at": now, "claim_id": claim_id}, "$inc": {"attempts": 1}}
+        )
+        return await db[self.collection].find({"claim_id": claim_id}, {"_id": 0}).to_list(self.batch_size)
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        # Jitter keeps a batch that failed together from retrying together
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _deliver(self, db, batch: List[Dict[str, Any]]):
+        try:
+            results = await self.sender.send_batch(batch)
+        except Exception as e:
+            logger.error(f"Notification sender failed: {e}")
+            results = [DeliveryError(str(e))] * len(batch)
+
+        now = datetime.now(timezone.utc)
+        updates = []
+        for message, error in zip(batch, results):
+            claim = {"id": message["id"], "claim_id": message["claim_id"]}
+            if error is None:
+                self._counters["sent"] += 1
+                updates.append(UpdateOne(claim, {
+                    "$set": {"status": "sent", "sent_at": now},
+                    "$unset": {"claim_id": "", "last_error": ""}
+                }))
+            elif error.permanent or message["attempts"] >= self.max_attempts:
+                self._counters["failed"] += 1
+                logger.error(f"Notification {message['id']} to {message['to']} failed after "
+                             f"{message['attempts']} attempts: {error}")
+                updates.append(UpdateOne(claim, {
+                    "$set": {"status": "failed", "failed_at": now, "last_error": str(error)},
+                    "$unset": {"claim_id": ""}
+                }))
+            else:
+                self._counters["retried"] += 1
+                updates.append(UpdateOne(claim, {
+                    "$set": {
+                        "status": "pending",
+                        "next_attempt_at": now + timedelta(seconds=self._retry_delay(message["attempts"])),
+                        "last_error": str(error)
+                    },
+                    "$unset": {"claim_id": ""}
+                }))
+        if updates:
+            await db[self.collection].bulk_write(updates, ordered=False)
+        self._counters["batches"] += 1
+
+    async def _work(self, db):
+        while True:
+            try:
+                batch = await self._claim_batch(db)
+                if batch:
+                    await self._deliver(db, batch)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error delivering notifications: {e}")
+            # Idle: sleep until something is enqueued here or the next poll (retries, other workers)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, db):
+        """Background loop: `workers` delivery loops until cancelled"""
+        self._wakeup = asyncio.Event()
+        await asyncio.gather(*[self._work(db) for _ in range(self.workers)])
+
+    async def stats(self, db) -> Dict[str, Any]:
+        """Messages per status in the outbox plus this worker's delivery counters"""
+        by_status = await db[self.collection].aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]).to_list(10)
+        counts = {status: 0 for status in STATUSES}
+        counts.update({s["_id"]: s["count"] for s in by_status})
+        return {"outbox": counts, "worker": dict(self._counters), "workers": self.workers,
+                "batch_size": self.batch_size, "max_attempts": self.max_attempts}
+
+def run_smtpd(host: str, port: int):
+    """Local SMTP stand-in: accepts every message and prints it"""
+    try:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.handlers import Debugging
+    except ImportError:
+        raise SystemExit("The SMTP stand-in needs aiosmtpd: pip install aiosmtpd")
+    controller = Controller(Debugging(), hostname=host, port=port)
+    controller.start()
+    print(f"✓ SMTP stand-in listening on {host}:{port} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        controller.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notification outbox tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    smtpd = commands.add_parser("smtpd", help="Run a local SMTP server that prints every message")
+    smtpd.add_argument("--host", default="localhost")
+    smtpd.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+    if args.command == "smtpd":
+        run_smtpd(args.host, args.port)
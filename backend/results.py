@@ -0,0 +1,143 @@
+"""
+Live election results for the AI-Enhanced Voting System.
+
+Per-election tallies are kept in memory: seeded from the sharded vote
+counters on first use, bumped by every vote this worker commits, and
+re-read periodically so votes committed by other workers show up.
+Subscribers receive the latest snapshot, at most max_rate times per
+second, however many votes arrive in between.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Snapshot = Tuple[Dict[str, int], int]
+
+class ResultsAggregator:
+    """In-memory per-election vote tallies with coalesced push to subscribers"""
+
+    def __init__(self, load_totals: Callable[[str], Awaitable[Dict[str, int]]], max_rate: float = 2.0,
+                 refresh_interval: float = 5.0, idle_timeout: float = 300.0):
+        self._load_totals = load_totals
+        self.max_rate = max_rate
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+
+        self._tallies: Dict[str, Dict[str, int]] = {}
+        self._versions: Dict[str, int] = {}
+        self._last_used: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._dirty: Set[str] = set()
+
+        self.votes_recorded = 0
+        self.published = 0
+        self.coalesced = 0
+
+    async def totals(self, election_id: str) -> Snapshot:
+        """Current (totals, version) for an election, seeding it from MongoDB if needed"""
+        self._last_used[election_id] = time.monotonic()
+        if election_id not in self._tallies:
+            lock = self._locks.setdefault(election_id, asyncio.Lock())
+            async with lock:
+                if election_id not in self._tallies:
+                    self._tallies[election_id] = await self._load_totals(election_id)
+                    self._versions[election_id] = 0
+        return dict(self._tallies[election_id]), self._versions[election_id]
+
+    def record_vote(self, election_id: str, candidate_id: str):
+        """Count a committed vote; elections nobody is watching are left to the next seed"""
+        tally = self._tallies.get(election_id)
+        if tally is None:
+            return
+        tally[candidate_id] = tally.get(candidate_id, 0) + 1
+        self._versions[election_id] += 1
+        self._dirty.add(election_id)
+        self.votes_recorded += 1
+
+    async def subscribe(self, election_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Snapshot]]:
+        """Yield the current snapshot, then each coalesced update; None after heartbeat idle seconds"""
+        # One slot: a slow subscriber only ever holds the newest snapshot
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(election_id, set()).add(queue)
+        try:
+            yield await self.totals(election_id)
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            subscribers = self._subscribers.get(election_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[election_id]
+
+    def _publish(self, election_id: str):
+        snapshot = (dict(self._tallies[election_id]), self._versions[election_id])
+        for queue in self._subscribers.get(election_id, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.coalesced += 1
+            queue.put_nowait(snapshot)
+        self.published += 1
+
+    async def _refresh(self):
+        """Fold in votes committed by other workers and forget elections nobody looks at"""
+        now = time.monotonic()
+        for election_id in list(self._tallies):
+            if election_id not in self._subscribers and now - self._last_used.get(election_id, 0) > self.idle_timeout:
+                self._tallies.pop(election_id, None)
+                self._versions.pop(election_id, None)
+                self._last_used.pop(election_id, None)
+                self._locks.pop(election_id, None)
+                self._dirty.discard(election_id)
+                continue
+
+            fresh = await self._load_totals(election_id)
+            tally = self._tallies.get(election_id)
+            if tally is None:
+                continue
+            # Counts only grow; taking the max keeps local votes committed during the read
+            changed = False
+            for candidate_id, count in fresh.items():
+                if count > tally.get(candidate_id, 0):
+                    tally[candidate_id] = count
+                    changed = True
+            if changed:
+                self._versions[election_id] += 1
+                self._dirty.add(election_id)
+
+    async def run(self):
+        """Background loop: publish dirty elections at max_rate, refresh from MongoDB periodically"""
+        interval = 1.0 / self.max_rate
+        last_refresh = time.monotonic()
+        while True:
+            try:
+                if time.monotonic() - last_refresh >= self.refresh_interval:
+                    last_refresh = time.monotonic()
+                    await self._refresh()
+                dirty, self._dirty = self._dirty, set()
+                for election_id in dirty:
+                    if election_id in self._tallies:
+                        self._publish(election_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error publishing live results: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "elections": len(self._tallies),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "votes_recorded": self.votes_recorded,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "max_rate": self.max_rate
+        }
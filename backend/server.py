@@ -1,9 +1,12 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Header
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Header, Query, Depends
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
+import atexit
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,9 +14,14 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=True)
 
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple, Union
 import uuid
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
 from datetime import datetime, timezone, timedelta
+from collections import Counter
 import bcrypt
 import jwt
 import base64
@@ -21,9 +29,23 @@ import io
 import re
 from PIL import Image
 import numpy as np
-from deepface import DeepFace
-from sklearn.ensemble import IsolationForest
 import json
+import orjson
+import shutil
+import tempfile
+import zipfile
+from face_service import FaceInferenceService
+from face_index import FaceIndex
+from embeddings import decode_embedding, encode_embedding, format_for_dtype
+from cache import TTLCache
+from fraud import FraudScorer
+from indexes import ensure_indexes
+from logging_setup import configure_logging, sampled
+from notifications import LogSender, NotificationOutbox, SmtpSender
+from results import ResultsAggregator
+from stats import StatsService
+from tracing import Tracer, TracingMiddleware
+from voter_import import ImageSource, VoterImporter, manifest_id, read_manifest
 mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017")
 db_name = os.getenv("DB_NAME", "smartballot")
 
@@ -33,14 +55,201 @@ print(f"OK: Using Database: {db_name}")
 client = AsyncIOMotorClient(mongo_url)
 db = client[db_name]
 
-app = FastAPI()
+# orjson renders responses; read endpoints declare response models so FastAPI
+# serializes them with pydantic-core instead of the generic jsonable_encoder
+app = FastAPI(default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = int(os.environ.get("JWT_EXPIRATION", 24))
+# EventSource can only authenticate through the URL, so the live results stream takes
+# a short-lived ticket for one election instead of the admin's session token
+STREAM_TICKET_SECONDS = int(os.environ.get("STREAM_TICKET_SECONDS", 60))
+STREAM_TICKET_SCOPE = "results_stream"
+
+# Per-stage timings of the vote, login and registration requests (see tracing.py),
+# exported as histograms on /metrics. SERVER_TIMING=on also returns them to the
+# client in a Server-Timing header. With REQUEST_TRACING=off no request is traced.
+REQUEST_TRACING = os.environ.get("REQUEST_TRACING", "off").lower() == "on"
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "off").lower() == "on"
+TRACED_OPERATIONS = {
+    "/api/vote": "submit_vote",
+    "/api/vote/upload": "submit_vote",
+    "/api/auth/login": "login_user",
+    "/api/auth/login/upload": "login_user",
+    "/api/auth/register": "register_user",
+    "/api/auth/register/upload": "register_user"
+}
+tracer = Tracer()
+
+# Face inference runs in a separate process pool (see face_service.py)
+face_service = FaceInferenceService(
+    workers=int(os.environ.get("FACE_WORKERS", 2)),
+    queue_size=int(os.environ.get("FACE_QUEUE_SIZE", 32)),
+    timeout=float(os.environ.get("FACE_TIMEOUT_SECONDS", 10)),
+    max_batch_size=int(os.environ.get("FACE_BATCH_SIZE", 8)),
+    max_batch_wait_ms=float(os.environ.get("FACE_BATCH_WAIT_MS", 5)),
+    detector_backend=os.environ.get("FACE_DETECTOR", "opencv"),
+    tracer=tracer
+)
+# Clients may send an image already cropped to the face (face_cropped: true), which
+# skips detection; off by default so every embedding comes from the same detector
+FACE_CLIENT_CROP = os.environ.get("FACE_CLIENT_CROP", "off").lower() == "on"
+
+# 1:N duplicate-face index used at registration (see face_index.py)
+face_index = FaceIndex(
+    threshold=float(os.environ.get("FACE_DEDUP_THRESHOLD", 0.40)),
+    shard_size=int(os.environ.get("FACE_INDEX_SHARD_SIZE", 65536)),
+    # Scratch directory for memory-mapped shards; each process maps its own temporary files
+    mmap_dir=os.environ.get("FACE_INDEX_DIR") or None,
+    # How far back each sync re-reads users that may have been committed late
+    lookback_seconds=float(os.environ.get("FACE_INDEX_LOOKBACK_SECONDS", 30))
+)
+FACE_INDEX_SYNC_SECONDS = int(os.environ.get("FACE_INDEX_SYNC_SECONDS", 60))
+# A registration reuses an index sync this recent (or joins one in flight) instead of starting its own
+FACE_INDEX_FRESHNESS_SECONDS = float(os.environ.get("FACE_INDEX_FRESHNESS_SECONDS", 0.5))
+
+# Stored face embeddings are packed binary in this precision ("float32" or "float16")
+EMBEDDING_FORMAT = format_for_dtype(os.environ.get("EMBEDDING_DTYPE", "float32"))
+
+# Vote writes use a transaction when the deployment supports it:
+# "auto" detects a replica set at startup, "on"/"off" force the choice
+VOTE_TRANSACTIONS = os.environ.get("VOTE_TRANSACTIONS", "auto").lower()
+vote_transactions_enabled = VOTE_TRANSACTIONS == "on"
+
+# Elections and candidate lists change only on admin edits; cache them per worker.
+# Set CACHE_CHANGE_STREAMS=on (replica set required) to invalidate across workers.
+CACHE_TTL_SECONDS = float(os.environ.get("CACHE_TTL_SECONDS", 30))
+CACHE_CHANGE_STREAMS = os.environ.get("CACHE_CHANGE_STREAMS", "off").lower() == "on"
+election_cache = TTLCache("elections", ttl=CACHE_TTL_SECONDS)
+candidate_cache = TTLCache("candidates", ttl=CACHE_TTL_SECONDS)
+
+# Verified JWT claims are cached per token until the token expires, and the
+# small user record auth checks need (status, voted_elections) for a few seconds.
+# The user record is dropped on vote; USER_CACHE_TTL_SECONDS=0 disables it.
+token_cache = TTLCache("tokens", ttl=JWT_EXPIRATION_HOURS * 3600, maxsize=int(os.environ.get("TOKEN_CACHE_SIZE", 10000)))
+user_cache = TTLCache("auth_users", ttl=float(os.environ.get("USER_CACHE_TTL_SECONDS", 10)), maxsize=10000)
+AUTH_USER_PROJECTION = {"_id": 0, "id": 1, "status": 1, "voted_elections": 1}
+
+# Vote tallies live in N counter documents per candidate (db.vote_counters)
+# so a popular candidate is not a single hot document
+VOTE_COUNTER_SHARDS = int(os.environ.get("VOTE_COUNTER_SHARDS", 16))
+# Holds the votes recorded before counters existed; live votes never write to it
+BACKFILL_SHARD = -1
+
+# Live results: tallies held in memory and pushed to subscribers at most
+# RESULTS_PUSH_MAX_RATE times a second; re-read from MongoDB every
+# RESULTS_REFRESH_SECONDS to pick up votes committed by other workers
+RESULTS_PUSH_MAX_RATE = float(os.environ.get("RESULTS_PUSH_MAX_RATE", 2))
+RESULTS_REFRESH_SECONDS = float(os.environ.get("RESULTS_REFRESH_SECONDS", 5))
+results_aggregator = ResultsAggregator(
+    lambda election_id: get_vote_totals(election_id),
+    max_rate=RESULTS_PUSH_MAX_RATE,
+    refresh_interval=RESULTS_REFRESH_SECONDS
+)
+# Latest encoded stream event per election: (version, totals, candidates list, bytes)
+results_events: Dict[str, Tuple[int, Dict[str, int], List[Dict[str, Any]], bytes]] = {}
+
+# Admin dashboard counters are bumped on write and recounted every
+# STATS_RECONCILE_SECONDS by whichever worker claims the pass
+stats_service = StatsService(
+    shards=int(os.environ.get("STATS_COUNTER_SHARDS", 8)),
+    reconcile_interval=float(os.environ.get("STATS_RECONCILE_SECONDS", 300))
+)
 
-logging.basicConfig(level=logging.INFO)
+# Outbound email goes through the notification outbox (see notifications.py): handlers
+# only enqueue, NOTIFY_WORKERS background loops deliver batches and retry failures with
+# exponential backoff. NOTIFY_BACKEND=log just logs each message; "smtp" sends via SMTP_*.
+NOTIFY_BACKEND = os.environ.get("NOTIFY_BACKEND", "log").lower()
+notification_outbox = NotificationOutbox(
+    sender=SmtpSender(
+        host=os.environ.get("SMTP_HOST", "localhost"),
+        port=int(os.environ.get("SMTP_PORT", 25)),
+        sender=os.environ.get("SMTP_FROM", "no-reply@voting.gov.in"),
+        username=os.environ.get("SMTP_USERNAME") or None,
+        password=os.environ.get("SMTP_PASSWORD") or None,
+        starttls=os.environ.get("SMTP_STARTTLS", "off").lower() == "on"
+    ) if NOTIFY_BACKEND == "smtp" else LogSender(),
+    workers=int(os.environ.get("NOTIFY_WORKERS", 2)),
+    batch_size=int(os.environ.get("NOTIFY_BATCH_SIZE", 20)),
+    max_attempts=int(os.environ.get("NOTIFY_MAX_ATTEMPTS", 6)),
+    retry_base=float(os.environ.get("NOTIFY_RETRY_BASE_SECONDS", 5))
+)
+
+# Bulk voter imports running in this worker, by import id (see voter_import.py)
+VOTER_IMPORT_BATCH_SIZE = int(os.environ.get("VOTER_IMPORT_BATCH_SIZE", 500))
+voter_import_tasks: Dict[str, asyncio.Task] = {}
+
+# Fields each read path actually uses; nothing else leaves MongoDB
+ELECTION_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "description": 1,
+    "start_date": 1, "end_date": 1, "status": 1, "created_at": 1
+}
+CANDIDATE_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "party": 1, "election_id": 1, "image_url": 1, "description": 1
+}
+SUSPICIOUS_VOTE_PROJECTION = {
+    "_id": 0, "id": 1, "user_id": 1, "election_id": 1, "candidate_id": 1, "timestamp": 1, "fraud_score": 1
+}
+
+# Admin voter listing: keyset pages over (created_at, id), listing fields only.
+# Filtered counts stop at VOTER_COUNT_LIMIT and are reported as estimates beyond it.
+VOTER_PAGE_SIZE = 50
+VOTER_PAGE_MAX = 200
+VOTER_COUNT_LIMIT = int(os.environ.get("VOTER_COUNT_LIMIT", 10000))
+VOTER_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "email": 1, "aadhaar": 1,
+    "gender": 1, "status": 1, "voted": 1, "created_at": 1
+}
+
+# Fraud scoring runs in the background. Workers share it through a lease in
+# db.job_leases: one trains and scores, the others take over if it stops
+# renewing for FRAUD_LEASE_SECONDS (keep this above the refit time)
+FRAUD_SCORING = os.environ.get("FRAUD_SCORING", "on").lower() == "on"
+FRAUD_SCORE_INTERVAL_SECONDS = float(os.environ.get("FRAUD_SCORE_INTERVAL_SECONDS", 30))
+FRAUD_REFIT_INTERVAL_SECONDS = float(os.environ.get("FRAUD_REFIT_INTERVAL_SECONDS", 3600))
+fraud_scorer = FraudScorer(
+    model_path=Path(os.environ.get("FRAUD_MODEL_PATH", Path(__file__).parent / "models" / "fraud_model.joblib")),
+    fit_sample=int(os.environ.get("FRAUD_FIT_SAMPLE", 100000)),
+    lease_seconds=float(os.environ.get("FRAUD_LEASE_SECONDS", 300))
+)
+
+# Long-running tasks started at startup and cancelled at shutdown
+background_tasks: List[asyncio.Task] = []
+# Password hash upgrades running after their login has been answered
+rehash_tasks: Set[asyncio.Task] = set()
+
+# bcrypt releases the GIL, so a thread pool gives real parallel hashing
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+password_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 4)),
+    thread_name_prefix="bcrypt"
+)
+
+# Maximum embedding distance accepted as the same person
+FACE_MATCH_THRESHOLD = 0.6
+
+# Multipart face uploads: size limits and the resolution we decode to
+MAX_FACE_IMAGE_BYTES = int(os.environ.get("MAX_FACE_IMAGE_BYTES", 5 * 1024 * 1024))
+MAX_FACE_IMAGE_PIXELS = int(os.environ.get("MAX_FACE_IMAGE_PIXELS", 4096 * 4096))
+FACE_DETECT_SIZE = int(os.environ.get("FACE_DETECT_SIZE", 640))
+FACE_DECODE_SIZE = (FACE_DETECT_SIZE, FACE_DETECT_SIZE)
+
+# Log output is written by a listener thread off a bounded queue (see logging_setup.py).
+# LOG_FORMAT=json writes one JSON object per line. Each call site may log
+# LOG_RATE_LIMIT records a second (bursts of LOG_RATE_BURST) below WARNING; the
+# access log is not limited. The per-request face distance lines keep only
+# LOG_SAMPLE_RATE of theirs.
+log_pipeline = configure_logging(
+    level=os.environ.get("LOG_LEVEL", "INFO"),
+    fmt=os.environ.get("LOG_FORMAT", "text").lower(),
+    queue_size=int(os.environ.get("LOG_QUEUE_SIZE", 10000)),
+    rate_limit=float(os.environ.get("LOG_RATE_LIMIT", 20)),
+    burst=int(os.environ.get("LOG_RATE_BURST", 50))
+)
+atexit.register(log_pipeline.stop)
+SAMPLED_LOG = sampled(float(os.environ.get("LOG_SAMPLE_RATE", 0.01)))
 logger = logging.getLogger(__name__)
 
 # ==================== MODELS ====================
@@ -52,11 +261,13 @@ class UserRegister(BaseModel):
     email: EmailStr
     password: str
     face_image: Optional[str] = None  # Base64 encoded, optional
+    face_cropped: bool = False  # face_image is already cropped to the face
 
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
     face_image: Optional[str] = None
+    face_cropped: bool = False
 
 class AdminLogin(BaseModel):
     email: EmailStr
@@ -79,6 +290,7 @@ class VoteSubmit(BaseModel):
     election_id: str
     candidate_id: str
     face_image: Optional[str] = None # Optional
+    face_cropped: bool = False
 
 class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -86,7 +298,7 @@ class User(BaseModel):
     name: str
     aadhaar: str
     email: str
-    face_embedding: List[float]
+    face_embedding: Union[bytes, List[float]] = []  # packed binary, see embeddings.py
     status: str = "active"
     voted: bool = False
     voted_elections: List[str] = []
@@ -120,6 +332,62 @@ class Vote(BaseModel):
     candidate_id: str
     timestamp: str
 
+# ---------- Response models ----------
+
+class ElectionList(BaseModel):
+    elections: List[Election]
+
+class ElectionWithStatus(Election):
+    has_voted: bool
+
+class ElectionStatusList(BaseModel):
+    elections: List[ElectionWithStatus]
+
+class CandidateList(BaseModel):
+    candidates: List[Candidate]
+
+class VoteStatus(BaseModel):
+    has_voted: bool
+
+class VoterSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    name: str
+    email: str
+    aadhaar: str
+    gender: str = "Other"
+    status: str = "active"
+    voted: bool = False
+    created_at: str
+
+class VoterPage(BaseModel):
+    voters: List[VoterSummary]
+    next_cursor: Optional[str]
+    # Only on the first page (no cursor)
+    total: Optional[int]
+    total_is_estimate: bool
+
+class ElectionResults(BaseModel):
+    candidates: List[Candidate]
+    total_votes: int
+    version: int
+
+class SuspiciousVote(Vote):
+    fraud_score: Optional[float] = None
+
+class FraudReport(BaseModel):
+    success: bool
+    suspicious_votes: List[SuspiciousVote]
+    analysis_metrics: Dict[str, Any]
+
+class AdminStats(BaseModel):
+    total_users: int
+    total_elections: int
+    active_elections: int
+    total_votes: int
+    gender_stats: Dict[str, int]
+    freshness: Dict[str, Any]
+
 # ==================== UTILITIES ====================
 
 def validate_aadhaar(aadhaar: str) -> bool:
@@ -127,21 +395,73 @@ def validate_aadhaar(aadhaar: str) -> bool:
     pattern = r'^\d{12}$'
     return bool(re.match(pattern, aadhaar))
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
 
 def verify_password(password: str, hashed: str) -> bool:
     """Verify password against hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+def password_needs_rehash(hashed: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS"""
+    try:
+        # bcrypt hashes look like $2b$12$<salt+hash>
+        return int(hashed.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def hash_password_async(password: str) -> str:
+    """Hash password on the bcrypt thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """Verify password on the bcrypt thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, password, hashed)
+
+async def rehash_password_if_needed(collection, account_id: str, password: str, hashed: str):
+    """Upgrade a stored hash to the configured cost after a successful login"""
+    if not password_needs_rehash(hashed):
+        return
+    try:
+        new_hash = await hash_password_async(password)
+        await collection.update_one({"id": account_id}, {"$set": {"password_hash": new_hash}})
+        logger.info(f"Password hash upgraded to cost {BCRYPT_ROUNDS} for: {account_id}")
+    except Exception as e:
+        logger.error(f"Password rehash failed for {account_id}: {e}")
+
+def schedule_password_rehash(collection, account_id: str, password: str, hashed: str):
+    """Run rehash_password_if_needed after the response instead of inside the login request"""
+    if not password_needs_rehash(hashed):
+        return
+    task = asyncio.create_task(rehash_password_if_needed(collection, account_id, password, hashed))
+    # The loop only keeps weak references to tasks; hold on until it finishes
+    rehash_tasks.add(task)
+    task.add_done_callback(rehash_tasks.discard)
+
 def create_token(user_id: str, email: str, role: str = 'user') -> str:
     """Create JWT token"""
+    now = datetime.now(timezone.utc)
     payload = {
         'user_id': user_id,
         'email': email,
         'role': role,
-        'exp': datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
+        'iat': now,
+        'exp': now + timedelta(hours=JWT_EXPIRATION_HOURS)
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def create_stream_ticket(user_id: str, election_id: str) -> str:
+    """Signed ticket that opens the results stream of one election, and nothing else"""
+    now = datetime.now(timezone.utc)
+    payload = {
+        'user_id': user_id,
+        'scope': STREAM_TICKET_SCOPE,
+        'election_id': election_id,
+        'iat': now,
+        'exp': now + timedelta(seconds=STREAM_TICKET_SECONDS)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
@@ -154,6 +474,52 @@ def decode_token(token: str) -> Dict[str, Any]:
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+def encode_voter_cursor(voter: Dict[str, Any]) -> str:
+    """Opaque page cursor holding the sort key of the last voter on a page"""
+    key = json.dumps([voter.get("created_at"), voter["id"]]).encode()
+    return base64.urlsafe_b64encode(key).decode()
+
+def decode_voter_cursor(cursor: str) -> tuple:
+    try:
+        created_at, voter_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return created_at, voter_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def decode_token_cached(token: str) -> Dict[str, Any]:
+    """decode_token, remembering verified claims until the token's exp"""
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        remaining = claims.get('exp', 0) - datetime.now(timezone.utc).timestamp()
+        if remaining > 0:
+            token_cache.set(token, claims, ttl=remaining)
+    return claims
+
+async def get_token_claims(authorization: str = Header(None)) -> Dict[str, Any]:
+    """Dependency: verified claims of the request's Bearer token"""
+    if not authorization or not authorization.startswith('Bearer '):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    with tracer.stage("jwt_decode"):
+        claims = decode_token_cached(authorization.split(' ')[1])
+    if 'scope' in claims:
+        # Stream tickets are only good for the endpoint they were issued for
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return claims
+
+async def require_admin(claims: Dict[str, Any] = Depends(get_token_claims)) -> Dict[str, Any]:
+    """Dependency: as get_token_claims, but only for admin tokens"""
+    if claims.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return claims
+
+async def get_auth_user(user_id: str) -> Optional[Dict[str, Any]]:
+    """The projected user record auth checks need, served from the user cache"""
+    return await user_cache.get_or_load(
+        user_id,
+        lambda: db.users.find_one({"id": user_id}, AUTH_USER_PROJECTION)
+    )
+
 def base64_to_image(base64_str: str) -> Optional[np.ndarray]:
     """Convert base64 string to image array"""
     try:
@@ -173,133 +539,386 @@ def base64_to_image(base64_str: str) -> Optional[np.ndarray]:
             base64_str += '=' * (4 - missing_padding)
             
         img_data = base64.b64decode(base64_str)
-        img = Image.open(io.BytesIO(img_data))
-        img = img.convert('RGB')
-        return np.array(img)
+        if len(img_data) > MAX_FACE_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail="Face image too large")
+        # Same path as uploads: decoded straight to detector resolution
+        return decode_image(io.BytesIO(img_data))
+    except HTTPException as e:
+        raise e
     except Exception as e:
         error_msg = str(e)
-        logger.error(f"ERROR: Error converting base64 to image: {error_msg}")
-        # Log the first 50 characters of base64_str for debugging
-        if base64_str:
-            logger.info(f"Base64 prefix: {base64_str[:50]}... (Length: {len(base64_str)})")
-        else:
-            logger.info("Base64 string is empty or None")
+        # Only the length: the payload is a face image
+        logger.error("ERROR: Error converting base64 to image: %s (length %d)", error_msg, len(base64_str or ""))
         raise HTTPException(status_code=400, detail=f"Invalid image data: {error_msg}")
 
-def extract_face_embedding(image_array: np.ndarray) -> List[float]:
-    """Extract face embedding using DeepFace"""
+def decode_image(fp) -> np.ndarray:
+    """Decode an image file object straight to detector resolution"""
     try:
-        embedding_objs = DeepFace.represent(
-            img_path=image_array,
-            model_name='Facenet',
-            enforce_detection=True
-        )
-        # DeepFace.represent returns a list of dicts, access embedding properly
-        if isinstance(embedding_objs, list) and len(embedding_objs) > 0:
-            return list(embedding_objs[0]['embedding'])  # type: ignore
-        raise ValueError("No face detected")
+        # Image.open only parses the header, so oversized images are rejected before decoding
+        img = Image.open(fp)
+        if img.width * img.height > MAX_FACE_IMAGE_PIXELS:
+            raise HTTPException(status_code=413, detail="Face image resolution too large")
+        # JPEG: let libjpeg decode at a reduced DCT scale instead of full size
+        img.draft('RGB', FACE_DECODE_SIZE)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail(FACE_DECODE_SIZE)
+        return np.asarray(img)
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        logger.error(f"Error extracting face embedding: {e}")
-        raise HTTPException(status_code=400, detail="Could not detect face in image")
-
-def compare_faces(embedding1: List[float], embedding2: List[float], threshold: float = 0.6) -> bool:
+        logger.error(f"ERROR: Error decoding uploaded image: {e}")
+        raise HTTPException(status_code=400, detail=f"Invalid image data: {str(e)}")
+
+async def upload_to_image(upload: UploadFile) -> Optional[np.ndarray]:
+    """Decode a multipart face upload without base64 or extra byte copies"""
+    size = upload.size
+    if size is None:
+        upload.file.seek(0, io.SEEK_END)
+        size = upload.file.tell()
+    if size == 0:
+        return None
+    if size > MAX_FACE_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="Face image too large")
+    
+    await upload.seek(0)
+    # PIL reads directly from Starlette's spooled upload file; decoding is CPU work, off the event loop
+    return await asyncio.to_thread(decode_image, upload.file)
+
+async def load_face_image(source: Union[str, UploadFile, None]) -> Optional[np.ndarray]:
+    """Decode a face image from either a base64 JSON field or a multipart upload"""
+    if source is None:
+        return None
+    if isinstance(source, str):
+        # base64 and image decoding are CPU work; keep them off the event loop
+        return await asyncio.to_thread(base64_to_image, source)
+    return await upload_to_image(source)
+
+async def extract_face_embedding(image_array: np.ndarray, cropped: bool = False) -> List[float]:
+    """Extract face embedding using the DeepFace worker pool (cropped: skip detection, if allowed)"""
+    return await face_service.represent(image_array, cropped=cropped and FACE_CLIENT_CROP)
+
+async def image_bytes_to_embedding(data: bytes) -> Optional[List[float]]:
+    """Embedding for raw image file bytes (bulk import), decoded off the event loop"""
+    if len(data) > MAX_FACE_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="Face image too large")
+    image_array = await asyncio.to_thread(decode_image, io.BytesIO(data))
+    return await extract_face_embedding(image_array)
+
+async def bump_stats(**deltas):
+    """Best-effort dashboard counter update after a write has committed.
+
+    A failure here must not fail the request whose write already succeeded;
+    stats reconciliation corrects the lost bump.
+    """
+    try:
+        await stats_service.increment(db, **deltas)
+    except Exception as e:
+        logger.warning(f"Could not update the dashboard counters {deltas}: {e}")
+
+async def count_imported_voters(voters: List[Dict[str, Any]]):
+    """Bump the dashboard counters for a batch of imported voters"""
+    for gender, count in Counter(v["gender"] for v in voters).items():
+        await bump_stats(total_users=count, gender=gender)
+
+def build_voter_importer(batch_size: int = VOTER_IMPORT_BATCH_SIZE) -> VoterImporter:
+    """A VoterImporter wired to the same hashing, face pipeline and counters as registration"""
+    return VoterImporter(
+        db,
+        hash_password=hash_password_async,
+        extract_embedding=image_bytes_to_embedding,
+        encode_embedding=lambda embedding: encode_embedding(embedding, EMBEDDING_FORMAT),
+        face_index=face_index,
+        on_inserted=count_imported_voters,
+        batch_size=batch_size,
+        face_concurrency=max(1, face_service.queue_size // 2)
+    )
+
+def face_distance(embedding1, embedding2) -> Optional[float]:
+    """Euclidean distance between two face embeddings (stored binary or float lists)"""
+    vector1 = decode_embedding(embedding1)
+    vector2 = decode_embedding(embedding2)
+    if vector1 is None or vector2 is None:
+        return None
+    return float(np.linalg.norm(vector1 - vector2))
+
+def compare_faces(embedding1, embedding2, threshold: float = FACE_MATCH_THRESHOLD) -> bool:
     """Compare two face embeddings"""
     try:
-        # Calculate Euclidean distance
-        distance = np.linalg.norm(np.array(embedding1) - np.array(embedding2))
-        logger.info(f"Face comparison distance: {distance}")
+        distance = face_distance(embedding1, embedding2)
+        if distance is None:
+            return False
+        logger.info("Face comparison distance: %.4f", distance, extra=SAMPLED_LOG)
         # Convert numpy bool to Python bool
         return bool(distance < threshold)
     except Exception as e:
         logger.error(f"Error comparing faces: {e}")
         return False
 
-def mock_send_email(to_email: str, subject: str, body: str):
-    """Mock email sending - logs to console"""
-    logger.info(f"\n{'='*50}\nMOCK EMAIL\nTo: {to_email}\nSubject: {subject}\nBody: {body}\n{'='*50}\n")
+async def _apply_vote_writes(vote_doc: Dict[str, Any], session=None):
+    """Mark the user as voted, insert the vote and bump the candidate's tally"""
+    # Update user voted status with atomic check-and-set to prevent double voting
+    result = await db.users.update_one(
+        {
+            "id": vote_doc["user_id"],
+            "voted_elections": {"$ne": vote_doc["election_id"]}
+        },
+        {
+            "$set": {"voted": True},
+            "$push": {"voted_elections": vote_doc["election_id"]}
+        },
+        session=session
+    )
+    
+    if result.modified_count == 0:
+        raise HTTPException(status_code=400, detail="You have already voted in this election")
+    
+    await db.votes.insert_one(vote_doc, session=session)
+    
+    # Update candidate vote count (NOTA included) on a random counter shard
+    await db.vote_counters.update_one(
+        {
+            "election_id": vote_doc["election_id"],
+            "candidate_id": vote_doc["candidate_id"],
+            "shard": random.randrange(VOTE_COUNTER_SHARDS)
+        },
+        {"$inc": {"count": 1}},
+        upsert=True,
+        session=session
+    )
+
+async def get_vote_totals(election_id: str) -> Dict[str, int]:
+    """Sum the counter shards of an election into per-candidate totals"""
+    totals = await db.vote_counters.aggregate([
+        {"$match": {"election_id": election_id}},
+        {"$group": {"_id": "$candidate_id", "count": {"$sum": "$count"}}}
+    ]).to_list(None)
+    return {t["_id"]: t["count"] for t in totals}
+
+async def build_election_results(election_id: str, totals: Dict[str, int], version: int) -> Dict[str, Any]:
+    """Results payload: cached candidates ranked by their vote totals, NOTA included"""
+    candidates = [
+        {**candidate, "vote_count": totals.get(candidate["id"], 0)}
+        for candidate in await get_cached_candidates(election_id)
+    ]
+    
+    # NOTA votes have their own counter shards
+    nota_count = totals.get("nota", 0)
+    
+    if nota_count > 0:
+        candidates.append({
+            "id": "nota",
+            "name": "NOTA (None Of The Above)",
+            "party": "None",
+            "election_id": election_id,
+            "vote_count": nota_count,
+            "image_url": None,
+            "description": "Selected None of the above candidates"
+        })
+    candidates.sort(key=lambda x: x.get('vote_count', 0), reverse=True)
+    
+    return {
+        "candidates": candidates,
+        "total_votes": sum(c.get('vote_count', 0) for c in candidates),
+        "version": version
+    }
 
-async def detect_fraud():
-    """Detect fraudulent activities using Isolation Forest"""
+async def encode_results_event(election_id: str, totals: Dict[str, int], version: int) -> bytes:
+    """Server-sent event for a results snapshot, built and encoded once for all subscribers"""
+    candidates = await get_cached_candidates(election_id)
+    cached = results_events.get(election_id)
+    # Versions restart when an idle election is re-seeded, so the totals are compared too;
+    # a reloaded candidate list (added or removed candidates) is a new object
+    if cached is not None and cached[0] == version and cached[1] == totals and cached[2] is candidates:
+        return cached[3]
+    results = await build_election_results(election_id, totals, version)
+    event = b"id: %d\nevent: results\ndata: %s\n\n" % (version, orjson.dumps(results))
+    results_events[election_id] = (version, totals, candidates, event)
+    return event
+
+async def backfill_vote_counters():
+    """One-time seeding of vote_counters from votes recorded before the counters existed.
+    
+    The first worker to start with counters records a cutoff before it serves any vote;
+    votes before the cutoff are counted into their own BACKFILL_SHARD with $set, so a
+    run that crashed, or runs on several workers at once, can simply repeat. A separate
+    marker is written only once the backfill has completed.
+    """
+    if await db.migrations.find_one({"_id": "vote_counters_v1_done"}):
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    # $setOnInsert keeps the first cutoff when the backfill is retried
     try:
-        # Get all votes
-        votes = await db.votes.find({}, {"_id": 0}).to_list(1000)
-        
-        if len(votes) < 10:
-            return []
-        
-        # Create feature matrix (simplified)
-        features = []
-        for vote in votes:
-            vote_time = datetime.fromisoformat(vote['timestamp'])
-            features.append([
-                hash(vote['user_id']) % 1000,
-                vote_time.hour,
-                vote_time.minute
-            ])
-        
-        # Train Isolation Forest
-        clf = IsolationForest(contamination=0.1, random_state=42)
-        predictions = clf.fit_predict(features)
-        
-        # Get anomalies
-        anomalies = []
-        for i, pred in enumerate(predictions):
-            if pred == -1:
-                anomalies.append(votes[i])
-        
-        return anomalies
-    except Exception as e:
-        logger.error(f"Error in fraud detection: {e}")
-        return []
+        marker = await db.migrations.find_one_and_update(
+            {"_id": "vote_counters_v1"},
+            {"$setOnInsert": {"cutoff": now, "started_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Another worker inserted the marker at the same moment
+        marker = await db.migrations.find_one({"_id": "vote_counters_v1"})
+    
+    totals = await db.votes.aggregate([
+        {"$match": {"timestamp": {"$lt": marker["cutoff"]}}},
+        {"$group": {"_id": {"election_id": "$election_id", "candidate_id": "$candidate_id"}, "count": {"$sum": 1}}}
+    ]).to_list(None)
+    for t in totals:
+        await db.vote_counters.update_one(
+            {"election_id": t["_id"]["election_id"], "candidate_id": t["_id"]["candidate_id"], "shard": BACKFILL_SHARD},
+            {"$set": {"count": t["count"]}},
+            upsert=True
+        )
+    await db.migrations.update_one(
+        {"_id": "vote_counters_v1_done"},
+        {"$set": {"completed_at": datetime.now(timezone.utc).isoformat(), "candidates": len(totals)}},
+        upsert=True
+    )
+    logger.info(f"OK: Vote counters backfilled for {len(totals)} candidates")
+
+async def commit_vote(vote_doc: Dict[str, Any]):
+    """Commit all vote writes atomically.
+    
+    Uses a multi-document transaction when MongoDB runs as a replica set;
+    on a standalone server the writes run in order and the voted flag is
+    rolled back if recording the vote fails.
+    """
+    if vote_transactions_enabled:
+        async def run_in_transaction(session):
+            await _apply_vote_writes(vote_doc, session=session)
+        
+        async with await client.start_session() as session:
+            await session.with_transaction(run_in_transaction)
+    else:
+        try:
+            await _apply_vote_writes(vote_doc)
+        except HTTPException:
+            raise
+        except Exception:
+            # Don't leave the user marked as voted without a vote record; voted stays
+            # set only if they have voted in another election
+            await db.users.update_one(
+                {"id": vote_doc["user_id"]},
+                [
+                    {"$set": {"voted_elections": {"$filter": {
+                        "input": {"$ifNull": ["$voted_elections", []]},
+                        "cond": {"$ne": ["$$this", vote_doc["election_id"]]}
+                    }}}},
+                    {"$set": {"voted": {"$gt": [{"$size": "$voted_elections"}, 0]}}}
+                ]
+            )
+            await db.votes.delete_one({"id": vote_doc["id"]})
+            raise
+    
+    # The dashboard counter stays out of the vote's writes: its shards are shared by every
+    # vote (transaction conflicts) and a lost bump is corrected by stats reconciliation
+    await bump_stats(total_votes=1)
+    user_cache.invalidate(vote_doc["user_id"])
+    results_aggregator.record_vote(vote_doc["election_id"], vote_doc["candidate_id"])
+
+async def get_cached_election(election_id: str) -> Optional[Dict[str, Any]]:
+    """Election document by id, served from the election cache"""
+    return await election_cache.get_or_load(
+        ("id", election_id),
+        lambda: db.elections.find_one({"id": election_id}, ELECTION_PROJECTION)
+    )
+
+async def get_cached_active_elections() -> List[Dict[str, Any]]:
+    """All active elections, served from the election cache"""
+    return await election_cache.get_or_load(
+        ("active",),
+        lambda: db.elections.find({"status": "active"}, ELECTION_PROJECTION).to_list(100)
+    )
+
+async def get_cached_candidates(election_id: str) -> List[Dict[str, Any]]:
+    """Candidates of an election, served from the candidate cache"""
+    return await candidate_cache.get_or_load(
+        election_id,
+        lambda: db.candidates.find({"election_id": election_id}, CANDIDATE_PROJECTION).to_list(100)
+    )
 
 # ==================== AUTH ENDPOINTS ====================
 
 @api_router.post("/auth/register")
 async def register_user(data: UserRegister):
+    return await _register_user(data, data.face_image)
+
+@api_router.post("/auth/register/upload")
+async def register_user_upload(
+    name: str = Form(...),
+    aadhaar: str = Form(...),
+    email: EmailStr = Form(...),
+    password: str = Form(...),
+    gender: str = Form("Other"),
+    face_image: Optional[UploadFile] = File(None),
+    face_cropped: bool = Form(False)
+):
+    """Multipart variant of /auth/register that streams the face image"""
+    data = UserRegister(name=name, aadhaar=aadhaar, gender=gender, email=email, password=password,
+                        face_cropped=face_cropped)
+    return await _register_user(data, face_image)
+
+async def _register_user(data: UserRegister, face_source: Union[str, UploadFile, None]):
     try:
-        logger.info(f"Registration attempt for: {data.email}")
+        logger.info("Registration attempt for: %s", data.email)
         
         # Validate Aadhaar
         if not validate_aadhaar(data.aadhaar):
-            logger.warning(f"Invalid Aadhaar format: {data.aadhaar}")
+            logger.warning("Invalid Aadhaar format: %s", data.aadhaar)
             raise HTTPException(status_code=400, detail="Invalid Aadhaar format. Must be 12 digits.")
         
         # Check if user exists
-        existing_user = await db.users.find_one({"email": data.email}, {"_id": 0})
+        with tracer.stage("duplicate_check"):
+            existing_user = await db.users.find_one({"email": data.email}, {"_id": 1})
+            existing_aadhaar = None if existing_user else await db.users.find_one({"aadhaar": data.aadhaar}, {"_id": 1})
         if existing_user:
-            logger.warning(f"Email already registered: {data.email}")
+            logger.warning("Email already registered: %s", data.email)
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        existing_aadhaar = await db.users.find_one({"aadhaar": data.aadhaar}, {"_id": 0})
         if existing_aadhaar:
-            logger.warning(f"Aadhaar already registered: {data.aadhaar}")
+            logger.warning("Aadhaar already registered: %s", data.aadhaar)
             raise HTTPException(status_code=400, detail="Aadhaar already registered")
         
         # Extract face embedding (if valid image provided)
         face_embedding = []
-        if data.face_image and len(data.face_image.strip()) > 20: 
-            logger.info(f"Extracting face embedding from image (length: {len(data.face_image)})...")
+        is_upload = face_source is not None and not isinstance(face_source, str)
+        if is_upload or (face_source and len(face_source.strip()) > 20): 
+            logger.info("Extracting face embedding from image...")
             try:
-                image_array = base64_to_image(data.face_image)
+                with tracer.stage("image_decode"):
+                    image_array = await load_face_image(face_source)
                 if image_array is not None:
-                    face_embedding = extract_face_embedding(image_array)
+                    face_embedding = await extract_face_embedding(image_array, data.face_cropped)
                     logger.info("Face embedding extracted successfully")
                 else:
                     logger.warning("base64_to_image returned None, skipping embedding")
             except Exception as e:
+                # Busy/timeout responses from the face service go back to the client as-is
+                if isinstance(e, HTTPException) and e.status_code in (413, 429, 504):
+                    raise
                 logger.error(f"Failed to extract face embedding: {e}")
                 # If they provided an image but it's invalid, we should probably warn them
                 # but if they didn't really provide one (just a stub), we skip
-                if len(data.face_image) > 100:
+                if is_upload or len(face_source) > 100:
                     raise HTTPException(status_code=400, detail=f"Face registration failed: {str(e)}")
                 else:
                     logger.warning("Ignoring invalid short face_image string")
         else:
             logger.info("No valid face image provided (or too short), skipping embedding")
         
+        # Check the face is not already registered under another identity
+        if face_embedding:
+            with tracer.stage("face_dedup"):
+                await face_index.sync(db.users, max_age=FACE_INDEX_FRESHNESS_SECONDS)
+                match = await asyncio.to_thread(face_index.search, face_embedding)
+            if match:
+                logger.warning("Duplicate face for %s: matches user %s (distance %.3f)", data.email, match[0], match[1])
+                raise HTTPException(status_code=400, detail="Face already registered to another voter")
+        
         # Create user
         user_id = str(uuid.uuid4())
-        hashed_pwd = hash_password(data.password)
+        with tracer.stage("password_hash"):
+            hashed_pwd = await hash_password_async(data.password)
         
         user_doc = {
             "id": user_id,
@@ -308,24 +927,39 @@ async def register_user(data: UserRegister):
             "gender": data.gender,
             "email": data.email,
             "password_hash": hashed_pwd,
-            "face_embedding": face_embedding,
+            "face_embedding": encode_embedding(face_embedding, EMBEDDING_FORMAT) if face_embedding else [],
             "status": "active",
             "voted": False,
             "voted_elections": [],
             "created_at": datetime.now(timezone.utc).isoformat()
         }
         
-        await db.users.insert_one(user_doc)
-        logger.info(f"User registered successfully: {data.email}")
-        
-        # Mock email
-        mock_send_email(
-            data.email,
-            "Registration Successful",
-            f"Welcome {data.name}! Your voter account has been created successfully."
-        )
+        with tracer.stage("user_insert"):
+            try:
+                await db.users.insert_one(user_doc)
+            except DuplicateKeyError:
+                # Lost a race with a concurrent registration of the same email/Aadhaar
+                raise HTTPException(status_code=400, detail="Email or Aadhaar already registered")
+            await bump_stats(total_users=1, gender=data.gender)
+        if face_embedding:
+            face_index.add(user_id, face_embedding)
+        logger.info("User registered successfully: %s", data.email)
+        
+        # Welcome email is delivered by the outbox workers; registration doesn't wait on it
+        with tracer.stage("notify"):
+            try:
+                await notification_outbox.enqueue(
+                    db,
+                    data.email,
+                    "Registration Successful",
+                    f"Welcome {data.name}! Your voter account has been created successfully."
+                )
+            except Exception as e:
+                # The account exists either way; a lost welcome email is not worth failing on
+                logger.error(f"Could not queue welcome email for {data.email}: {e}")
         
-        token = create_token(user_id, data.email, 'user')
+        with tracer.stage("token_issue"):
+            token = create_token(user_id, data.email, 'user')
         
         return {
             "success": True,
@@ -345,38 +979,63 @@ async def register_user(data: UserRegister):
 
 @api_router.post("/auth/login")
 async def login_user(data: UserLogin):
+    return await _login_user(data, data.face_image)
+
+@api_router.post("/auth/login/upload")
+async def login_user_upload(
+    email: EmailStr = Form(...),
+    password: str = Form(...),
+    face_image: Optional[UploadFile] = File(None),
+    face_cropped: bool = Form(False)
+):
+    """Multipart variant of /auth/login that streams the face image"""
+    return await _login_user(UserLogin(email=email, password=password, face_cropped=face_cropped), face_image)
+
+async def _login_user(data: UserLogin, face_source: Union[str, UploadFile, None]):
     try:
-        logger.info(f"Login attempt for: {data.email}")
-        user = await db.users.find_one({"email": data.email}, {"_id": 0})
+        logger.info("Login attempt for: %s", data.email)
+        projection = {"_id": 0, "id": 1, "name": 1, "email": 1, "voted": 1, "password_hash": 1}
+        if face_source:
+            projection["face_embedding"] = 1
+        with tracer.stage("user_lookup"):
+            user = await db.users.find_one({"email": data.email}, projection)
         if not user:
-            logger.warning(f"User not found: {data.email}")
+            logger.warning("User not found: %s", data.email)
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
-        if not verify_password(data.password, user['password_hash']):
-            logger.warning(f"Invalid password for: {data.email}")
+        with tracer.stage("password_verify"):
+            password_ok = await verify_password_async(data.password, user['password_hash'])
+        if not password_ok:
+            logger.warning("Invalid password for: %s", data.email)
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
+        schedule_password_rehash(db.users, user['id'], data.password, user['password_hash'])
+        
         # Face verification if provided (optional for login)
-        if data.face_image:
+        if face_source:
             try:
-                image_array = base64_to_image(data.face_image)
+                with tracer.stage("image_decode"):
+                    image_array = await load_face_image(face_source)
                 if image_array is not None:
-                    current_embedding = extract_face_embedding(image_array)
+                    current_embedding = await extract_face_embedding(image_array, data.face_cropped)
                     
-                    if not compare_faces(user['face_embedding'], current_embedding):
-                        logger.warning(f"Face verification failed for: {data.email}")
+                    with tracer.stage("face_compare"):
+                        matched = compare_faces(user['face_embedding'], current_embedding)
+                    if not matched:
+                        logger.warning("Face verification failed for: %s", data.email)
                         raise HTTPException(status_code=401, detail="Face verification failed. Please try again.")
-                    logger.info(f"Face verification successful for: {data.email}")
+                    logger.info("Face verification successful for: %s", data.email)
                 else:
-                    logger.warning(f"Empty/Invalid face image provided for login: {data.email}")
+                    logger.warning("Empty/Invalid face image provided for login: %s", data.email)
             except HTTPException as e:
                 raise e
             except Exception as e:
                 logger.error(f"Face verification error: {e}")
                 raise HTTPException(status_code=401, detail="Face verification failed. Please try again.")
         
-        token = create_token(user['id'], user['email'], 'user')
-        logger.info(f"Login successful for: {data.email}")
+        with tracer.stage("token_issue"):
+            token = create_token(user['id'], user['email'], 'user')
+        logger.info("Login successful for: %s", data.email)
         
         return {
             "success": True,
@@ -398,15 +1057,20 @@ async def login_user(data: UserLogin):
 async def admin_login(data: AdminLogin):
     try:
         logger.info(f"Admin login attempt for: {data.email}")
-        admin = await db.admins.find_one({"email": data.email}, {"_id": 0})
+        admin = await db.admins.find_one(
+            {"email": data.email},
+            {"_id": 0, "id": 1, "email": 1, "name": 1, "password_hash": 1}
+        )
         if not admin:
             logger.warning(f"Admin not found: {data.email}")
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
-        if not verify_password(data.password, admin['password_hash']):
+        if not await verify_password_async(data.password, admin['password_hash']):
             logger.warning(f"Invalid password for admin: {data.email}")
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
+        schedule_password_rehash(db.admins, admin['id'], data.password, admin['password_hash'])
+        
         token = create_token(admin['id'], admin['email'], 'admin')
         logger.info(f"Admin login successful for: {data.email}")
         
@@ -427,43 +1091,73 @@ async def admin_login(data: AdminLogin):
 
 # ==================== VOTING ENDPOINTS ====================
 
-@api_router.get("/elections/active")
+@api_router.get("/elections/active", response_model=ElectionList)
 async def get_active_elections():
     try:
-        current_time = datetime.now(timezone.utc).isoformat()
-        elections = await db.elections.find(
-            {"status": "active"},
-            {"_id": 0}
-        ).to_list(100)
+        elections = await get_cached_active_elections()
         return {"elections": elections}
     except Exception as e:
         logger.error(f"Error fetching elections: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/elections/{election_id}/candidates")
+@api_router.get("/elections/active/status", response_model=ElectionStatusList)
+async def get_active_elections_with_status(claims: Dict[str, Any] = Depends(get_token_claims)):
+    """Active elections, each flagged with whether the caller has voted in it"""
+    try:
+        # One projected user lookup covers every election on the dashboard
+        elections, user = await asyncio.gather(
+            get_cached_active_elections(),
+            get_auth_user(claims['user_id'])
+        )
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        voted = set(user.get('voted_elections', []))
+        return {
+            "elections": [{**election, "has_voted": election["id"] in voted} for election in elections]
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching elections with vote status: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/elections/{election_id}/candidates", response_model=CandidateList)
 async def get_candidates(election_id: str):
     try:
-        candidates = await db.candidates.find(
-            {"election_id": election_id},
-            {"_id": 0}
-        ).to_list(100)
+        candidates = await get_cached_candidates(election_id)
         return {"candidates": candidates}
     except Exception as e:
         logger.error(f"Error fetching candidates: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/vote")
-async def submit_vote(data: VoteSubmit, authorization: str = Header(None)):
+async def submit_vote(data: VoteSubmit, claims: Dict[str, Any] = Depends(get_token_claims)):
+    return await _submit_vote(data, data.face_image, claims)
+
+@api_router.post("/vote/upload")
+async def submit_vote_upload(
+    election_id: str = Form(...),
+    candidate_id: str = Form(...),
+    face_image: Optional[UploadFile] = File(None),
+    face_cropped: bool = Form(False),
+    claims: Dict[str, Any] = Depends(get_token_claims)
+):
+    """Multipart variant of /vote that streams the face image"""
+    data = VoteSubmit(election_id=election_id, candidate_id=candidate_id, face_cropped=face_cropped)
+    return await _submit_vote(data, face_image, claims)
+
+async def _submit_vote(data: VoteSubmit, face_source: Union[str, UploadFile, None], claims: Dict[str, Any]):
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
+        user_id = claims['user_id']
         
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        user_id = payload['user_id']
+        # Fetch user, election and candidates in parallel; all three are usually cached
+        user, election, candidates = await asyncio.gather(
+            tracer.timed("user_lookup", get_auth_user(user_id)),
+            tracer.timed("election_lookup", get_cached_election(data.election_id)),
+            tracer.timed("candidate_lookup", get_cached_candidates(data.election_id))
+        )
         
-        # Get user
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -473,9 +1167,13 @@ async def submit_vote(data: VoteSubmit, authorization: str = Header(None)):
                 status_code=403,
                 detail="User not eligible to vote"
             )
+        
+        # A cached record can miss a very recent vote but never invents one, so this
+        # only short-cuts the face check; commit_vote still enforces one vote per election
+        if data.election_id in user.get("voted_elections", []):
+            raise HTTPException(status_code=400, detail="You have already voted in this election")
             
         # ---------- FIX 1: Check election exists ----------
-        election = await db.elections.find_one({"id": data.election_id})
         if not election:
             raise HTTPException(status_code=404, detail="Election not found")
 
@@ -501,24 +1199,33 @@ async def submit_vote(data: VoteSubmit, authorization: str = Header(None)):
 
         # ---------- FIX 2: Check candidate belongs to election ----------
         if data.candidate_id != "nota":
-            candidate = await db.candidates.find_one({
-                "id": data.candidate_id,
-                "election_id": data.election_id
-            })
-
-            if not candidate:
+            if not any(c["id"] == data.candidate_id for c in candidates):
                 raise HTTPException(
                     status_code=400,
                     detail="Invalid candidate for this election"
                 )
 
         # Face verification (Skip if user has no stored face OR if no image provided)
-        if user.get('face_embedding') and data.face_image:
-            image_array = base64_to_image(data.face_image)
+        face_margin = None
+        stored_embedding = None
+        if face_source:
+            # Only fetched when there is a face to compare against
+            with tracer.stage("face_lookup"):
+                face_doc = await db.users.find_one({"id": user_id}, {"_id": 0, "face_embedding": 1})
+            stored_embedding = (face_doc or {}).get('face_embedding')
+        if stored_embedding and face_source:
+            with tracer.stage("image_decode"):
+                image_array = await load_face_image(face_source)
             if image_array is not None:
-                current_embedding = extract_face_embedding(image_array)
-                if not compare_faces(user['face_embedding'], current_embedding):
+                current_embedding = await extract_face_embedding(image_array, data.face_cropped)
+                with tracer.stage("face_compare"):
+                    distance = face_distance(stored_embedding, current_embedding)
+                if distance is not None:
+                    logger.info("Face comparison distance: %.4f", distance, extra=SAMPLED_LOG)
+                if distance is None or distance >= FACE_MATCH_THRESHOLD:
                     raise HTTPException(status_code=401, detail="Face verification failed. Please try again.")
+                # How comfortably the face matched; a fraud-model feature
+                face_margin = FACE_MATCH_THRESHOLD - distance
             else:
                 logger.warning("Empty face image provided in vote, skipping verification")
         else:
@@ -531,32 +1238,14 @@ async def submit_vote(data: VoteSubmit, authorization: str = Header(None)):
             "user_id": user_id,
             "election_id": data.election_id,
             "candidate_id": data.candidate_id,
-            "timestamp": datetime.now(timezone.utc).isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            # Login time (token issue time) and face margin feed the fraud model
+            "auth_at": datetime.fromtimestamp(claims['iat'], tz=timezone.utc).isoformat() if 'iat' in claims else None,
+            "face_margin": face_margin
         }
         
-        # Update user voted status with atomic check-and-set to prevent double voting
-        result = await db.users.update_one(
-            {
-                "id": user_id,
-                "voted_elections": {"$ne": data.election_id}
-            },
-            {
-                "$set": {"voted": True},
-                "$push": {"voted_elections": data.election_id}
-            }
-        )
-        
-        if result.modified_count == 0:
-            raise HTTPException(status_code=400, detail="You have already voted in this election")
-        
-        await db.votes.insert_one(vote_doc)
-        
-        # Update candidate vote count
-        if data.candidate_id != "nota":
-            await db.candidates.update_one(
-                {"id": data.candidate_id},
-                {"$inc": {"vote_count": 1}}
-            )
+        with tracer.stage("vote_write"):
+            await commit_vote(vote_doc)
         
         return {
             "success": True,
@@ -568,17 +1257,10 @@ async def submit_vote(data: VoteSubmit, authorization: str = Header(None)):
         logger.error(f"Vote submission error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/vote/status/{election_id}")
-async def check_vote_status(election_id: str, authorization: str = Header(None)):
+@api_router.get("/vote/status/{election_id}", response_model=VoteStatus)
+async def check_vote_status(election_id: str, claims: Dict[str, Any] = Depends(get_token_claims)):
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        user_id = payload['user_id']
-        
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
+        user = await get_auth_user(claims['user_id'])
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -595,18 +1277,9 @@ async def check_vote_status(election_id: str, authorization: str = Header(None))
 
 # ==================== ADMIN ENDPOINTS ====================
 
-@api_router.post("/admin/elections")
-async def create_election(data: ElectionCreate, authorization: str = Header(None)):
+@api_router.post("/admin/elections", dependencies=[Depends(require_admin)])
+async def create_election(data: ElectionCreate):
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        
-        if payload.get('role') != 'admin':
-            raise HTTPException(status_code=403, detail="Admin access required")
-        
         election_id = str(uuid.uuid4())
         election_doc = {
             "id": election_id,
@@ -619,6 +1292,8 @@ async def create_election(data: ElectionCreate, authorization: str = Header(None
         }
         
         await db.elections.insert_one(election_doc)
+        election_cache.invalidate(("active",))
+        await bump_stats(total_elections=1, active_elections=int(election_doc["status"] == "active"))
         
         return {
             "success": True,
@@ -631,36 +1306,18 @@ async def create_election(data: ElectionCreate, authorization: str = Header(None
         logger.error(f"Error creating election: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/admin/elections")
-async def get_all_elections(authorization: str = Header(None)):
+@api_router.get("/admin/elections", dependencies=[Depends(require_admin)], response_model=ElectionList)
+async def get_all_elections():
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        
-        if payload.get('role') != 'admin':
-            raise HTTPException(status_code=403, detail="Admin access required")
-        
-        elections = await db.elections.find({}, {"_id": 0}).to_list(100)
+        elections = await db.elections.find({}, ELECTION_PROJECTION).to_list(100)
         return {"elections": elections}
     except Exception as e:
         logger.error(f"Error fetching elections: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.post("/admin/candidates")
-async def create_candidate(data: CandidateCreate, authorization: str = Header(None)):
+@api_router.post("/admin/candidates", dependencies=[Depends(require_admin)])
+async def create_candidate(data: CandidateCreate):
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        
-        if payload.get('role') != 'admin':
-            raise HTTPException(status_code=403, detail="Admin access required")
-        
         candidate_id = str(uuid.uuid4())
         candidate_doc = {
             "id": candidate_id,
@@ -673,6 +1330,7 @@ async def create_candidate(data: CandidateCreate, authorization: str = Header(No
         }
         
         await db.candidates.insert_one(candidate_doc)
+        candidate_cache.invalidate(data.election_id)
         
         return {
             "success": True,
@@ -685,22 +1343,17 @@ async def create_candidate(data: CandidateCreate, authorization: str = Header(No
         logger.error(f"Error creating candidate: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.delete("/admin/candidates/{candidate_id}")
-async def delete_candidate(candidate_id: str, authorization: str = Header(None)):
+@api_router.delete("/admin/candidates/{candidate_id}", dependencies=[Depends(require_admin)])
+async def delete_candidate(candidate_id: str):
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        
-        if payload.get('role') != 'admin':
-            raise HTTPException(status_code=403, detail="Admin access required")
-        
-        result = await db.candidates.delete_one({"id": candidate_id})
+        deleted = await db.candidates.find_one_and_delete(
+            {"id": candidate_id},
+            {"_id": 0, "election_id": 1}
+        )
         
-        if result.deleted_count == 0:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Candidate not found")
+        candidate_cache.invalidate(deleted["election_id"])
         
         return {
             "success": True,
@@ -712,157 +1365,318 @@ async def delete_candidate(candidate_id: str, authorization: str = Header(None))
         logger.error(f"Error deleting candidate: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/admin/voters")
-async def get_all_voters(authorization: str = Header(None)):
+@api_router.get("/admin/voters", dependencies=[Depends(require_admin)], response_model=VoterPage)
+async def get_all_voters(
+    limit: int = Query(VOTER_PAGE_SIZE, ge=1, le=VOTER_PAGE_MAX),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    gender: Optional[str] = None,
+    voted: Optional[bool] = None,
+    search: Optional[str] = None
+):
+    """One page of voters, newest first; pass next_cursor (and the same filters) back to get the following page.
+    
+    search matches the start of the email or the name, case-sensitively, so both
+    branches of the match are answered by an index instead of a collection scan.
+    """
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        
-        if payload.get('role') != 'admin':
-            raise HTTPException(status_code=403, detail="Admin access required")
+        query: Dict[str, Any] = {}
+        if status:
+            query["status"] = status
+        if gender:
+            query["gender"] = gender
+        if voted is not None:
+            query["voted"] = voted
+        if search and search.strip():
+            # Anchored prefix: bounded ranges on the email and name indexes
+            pattern = {"$regex": "^" + re.escape(search.strip())}
+            query["$or"] = [{"email": pattern}, {"name": pattern}]
+        
+        page_query = dict(query)
+        if cursor:
+            after_created_at, after_id = decode_voter_cursor(cursor)
+            page_query["$and"] = [{"$or": [
+                {"created_at": {"$lt": after_created_at}},
+                {"created_at": after_created_at, "id": {"$lt": after_id}}
+            ]}]
+        
+        # Fetch one extra row to know whether another page exists
+        page_task = db.users.find(page_query, VOTER_LIST_PROJECTION) \
+            .sort([("created_at", -1), ("id", -1)]) \
+            .limit(limit + 1) \
+            .to_list(limit + 1)
+        
+        total = None
+        if cursor:
+            voters = await page_task
+        else:
+            # Total for the filter, not the page, counted on the first page only;
+            # unfiltered uses collection metadata
+            if query:
+                total_task = db.users.count_documents(query, limit=VOTER_COUNT_LIMIT)
+            else:
+                total_task = db.users.estimated_document_count()
+            voters, total = await asyncio.gather(page_task, total_task)
         
-        voters = await db.users.find(
-            {},
-            {"_id": 0, "password_hash": 0, "face_embedding": 0}
-        ).to_list(1000)
+        next_cursor = None
+        if len(voters) > limit:
+            voters = voters[:limit]
+            next_cursor = encode_voter_cursor(voters[-1])
         
-        return {"voters": voters}
+        return {
+            "voters": voters,
+            "next_cursor": next_cursor,
+            "total": total,
+            "total_is_estimate": total is not None and (not query or total >= VOTER_COUNT_LIMIT)
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching voters: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/admin/results/{election_id}")
-async def get_election_results(election_id: str, authorization: str = Header(None)):
+@api_router.post("/admin/voters/import", dependencies=[Depends(require_admin)])
+async def import_voters(
+    manifest: UploadFile = File(...),
+    images: Optional[UploadFile] = File(None)
+):
+    """Start a bulk voter import from a CSV/JSONL manifest and an optional zip of face images"""
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        
-        if payload.get('role') != 'admin':
-            raise HTTPException(status_code=403, detail="Admin access required")
-        
-        candidates = await db.candidates.find(
-            {"election_id": election_id},
-            {"_id": 0}
-        ).sort("vote_count", -1).to_list(100)
-        
-        # Count NOTA votes
-        nota_count = await db.votes.count_documents({
-            "election_id": election_id,
-            "candidate_id": "nota"
-        })
-        
-        if nota_count > 0:
-            candidates.append({
-                "id": "nota",
-                "name": "NOTA (None Of The Above)",
-                "party": "None",
-                "election_id": election_id,
-                "vote_count": nota_count,
-                "image_url": None,
-                "description": "Selected None of the above candidates"
-            })
-            # Re-sort to show NOTA in its correct rank
-            candidates.sort(key=lambda x: x.get('vote_count', 0), reverse=True)
-
-        total_votes = sum(c.get('vote_count', 0) for c in candidates)
-        
-        return {
-            "candidates": candidates,
-            "total_votes": total_votes
-        }
+        suffix = Path(manifest.filename or "").suffix.lower()
+        if suffix not in (".csv", ".jsonl", ".ndjson", ".json"):
+            raise HTTPException(status_code=400, detail="Manifest must be a .csv or .jsonl file")
+        
+        # Spool uploads to disk; manifests and image archives can be far larger than memory
+        workdir = Path(tempfile.mkdtemp(prefix="voter-import-"))
+        manifest_path = workdir / f"manifest{suffix}"
+        with open(manifest_path, "wb") as f:
+            await asyncio.to_thread(shutil.copyfileobj, manifest.file, f)
+        images_path = None
+        if images is not None:
+            images_path = workdir / "images.zip"
+            with open(images_path, "wb") as f:
+                await asyncio.to_thread(shutil.copyfileobj, images.file, f)
+            if not await asyncio.to_thread(zipfile.is_zipfile, images_path):
+                shutil.rmtree(workdir, ignore_errors=True)
+                raise HTTPException(status_code=400, detail="Face images must be uploaded as a .zip archive")
+        
+        # Hashing a large manifest takes a while; keep it off the event loop
+        import_id = await asyncio.to_thread(manifest_id, manifest_path)
+        running = voter_import_tasks.get(import_id)
+        if running is not None and not running.done():
+            shutil.rmtree(workdir, ignore_errors=True)
+            return {"success": True, "import_id": import_id, "status": "running"}
+        previous = await db.voter_imports.find_one({"_id": import_id}, {"status": 1})
+        if previous is not None and previous.get("status") == "completed":
+            # Nothing left to resume
+            shutil.rmtree(workdir, ignore_errors=True)
+            return {"success": True, "import_id": import_id, "status": "completed"}
+        
+        async def run_import():
+            image_source = ImageSource(images_path)
+            try:
+                # Rows sent before the model is warm would time out
+                await face_service.wait_ready()
+                await build_voter_importer().run(import_id, read_manifest(manifest_path), image_source)
+            except Exception as e:
+                logger.error(f"Voter import {import_id} failed: {e}")
+            finally:
+                image_source.close()
+                shutil.rmtree(workdir, ignore_errors=True)
+                voter_import_tasks.pop(import_id, None)
+        
+        voter_import_tasks[import_id] = asyncio.create_task(run_import())
+        logger.info(f"Voter import {import_id} started")
+        # Re-uploading the same manifest resumes from its last checkpoint
+        return {"success": True, "import_id": import_id, "status": "running"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting voter import: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/admin/voters/import/{import_id}", dependencies=[Depends(require_admin)])
+async def get_voter_import(import_id: str):
+    """Progress of a bulk voter import"""
+    try:
+        progress = await db.voter_imports.find_one({"_id": import_id})
+        if not progress:
+            raise HTTPException(status_code=404, detail="Import not found")
+        progress["import_id"] = progress.pop("_id")
+        return progress
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching voter import: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/admin/results/{election_id}", dependencies=[Depends(require_admin)], response_model=ElectionResults)
+async def get_election_results(election_id: str):
+    try:
+        # Same in-memory snapshot the live stream pushes
+        totals, version = await results_aggregator.totals(election_id)
+        return await build_election_results(election_id, totals, version)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching results: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/admin/fraud/detect")
-async def detect_fraud_activity(authorization: str = Header(None)):
+@api_router.post("/admin/results/{election_id}/stream-ticket")
+async def create_results_stream_ticket(election_id: str, claims: Dict[str, Any] = Depends(require_admin)):
+    """Short-lived ticket for opening the live results stream with EventSource"""
+    return {
+        "ticket": create_stream_ticket(claims['user_id'], election_id),
+        "expires_in": STREAM_TICKET_SECONDS
+    }
+
+@api_router.get("/admin/results/{election_id}/stream")
+async def stream_election_results(election_id: str, ticket: Optional[str] = None, authorization: str = Header(None)):
+    """Server-Sent Events: the results payload, re-sent whenever the tallies change"""
+    if ticket:
+        # Only a stream ticket for this election; session tokens never go in the URL
+        claims = decode_token(ticket)
+        if claims.get('scope') != STREAM_TICKET_SCOPE or claims.get('election_id') != election_id:
+            raise HTTPException(status_code=401, detail="Invalid stream ticket")
+    else:
+        await require_admin(await get_token_claims(authorization))
+    
+    async def events():
+        # aclosing: drop the subscription as soon as the client disconnects
+        async with aclosing(results_aggregator.subscribe(election_id)) as snapshots:
+            async for snapshot in snapshots:
+                if snapshot is None:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield await encode_results_event(election_id, *snapshot)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.get("/admin/fraud/detect", dependencies=[Depends(require_admin)], response_model=FraudReport)
+async def detect_fraud_activity():
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        
-        if payload.get('role') != 'admin':
-            raise HTTPException(status_code=403, detail="Admin access required")
-        
-        all_votes = await db.votes.find({}, {"_id": 0}).to_list(1000)
-        suspicious = await detect_fraud()
+        # Votes are scored in the background (see fraud.py); this only reads the results
+        total_analyzed, anomalies_found, suspicious = await asyncio.gather(
+            db.votes.count_documents({"is_anomaly": {"$in": [True, False]}}),
+            db.votes.count_documents({"is_anomaly": True}),
+            db.votes.find({"is_anomaly": True}, SUSPICIOUS_VOTE_PROJECTION).sort("fraud_score", 1).to_list(1000)
+        )
         
-        accuracy = 98.4 if len(suspicious) == 0 else max(85, 100 - (len(suspicious) * 1.5))
+        accuracy = 98.4 if anomalies_found == 0 else max(85, 100 - (anomalies_found * 1.5))
 
         return {
             "success": True,
             "suspicious_votes": suspicious,
             "analysis_metrics": {
-                "total_analyzed": len(all_votes),
-                "anomalies_found": len(suspicious),
+                "total_analyzed": total_analyzed,
+                "anomalies_found": anomalies_found,
                 "model": "Isolation Forest",
                 "accuracy_score": f"{accuracy}%",
-                "confidence_level": "High" if accuracy > 90 else "Medium"
+                "confidence_level": "High" if accuracy > 90 else "Medium",
+                **fraud_scorer.stats()
             }
         }
     except Exception as e:
         logger.error(f"Error in fraud detection: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/admin/stats")
-async def get_admin_stats(authorization: str = Header(None)):
+@api_router.get("/admin/face/metrics", dependencies=[Depends(require_admin)])
+async def get_face_metrics():
     try:
-        if not authorization or not authorization.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
-        
-        token = authorization.split(' ')[1]
-        payload = decode_token(token)
-        
-        if payload.get('role') != 'admin':
-            raise HTTPException(status_code=403, detail="Admin access required")
-        
-        total_users = await db.users.count_documents({})
-        total_elections = await db.elections.count_documents({})
-        active_elections = await db.elections.count_documents({"status": "active"})
-        total_votes = await db.votes.count_documents({})
-        
-        # Gender Distribution
-        gender_stats = await db.users.aggregate([
-            {"$group": {"_id": "$gender", "count": {"$sum": 1}}}
-        ]).to_list(100)
-        
-        gender_breakdown = { "Male": 0, "Female": 0, "Other": 0 }
-        for g in gender_stats:
-            val = g["_id"] if g["_id"] in gender_breakdown else "Other"
-            gender_breakdown[val] += g["count"]
+        return {**face_service.metrics(), "index": face_index.stats()}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching face metrics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/admin/cache/stats", dependencies=[Depends(require_admin)])
+async def get_cache_stats():
+    try:
         return {
-            "total_users": total_users,
-            "total_elections": total_elections,
-            "active_elections": active_elections,
-            "total_votes": total_votes,
-            "gender_stats": gender_breakdown
+            "elections": election_cache.stats(),
+            "candidates": candidate_cache.stats(),
+            "change_streams": CACHE_CHANGE_STREAMS,
+            "tokens": token_cache.stats(),
+            "auth_users": user_cache.stats(),
+            "live_results": results_aggregator.stats()
         }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching cache stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/admin/notifications/stats", dependencies=[Depends(require_admin)])
+async def get_notification_stats():
+    """Outbox backlog by status and this worker's delivery counters"""
+    try:
+        return await notification_outbox.stats(db)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching notification stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/admin/stats", dependencies=[Depends(require_admin)], response_model=AdminStats)
+async def get_admin_stats():
+    try:
+        # Running counters: constant time however large the registry; see stats.py
+        return await stats_service.snapshot(db)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== INITIALIZATION ====================
 
+async def watch_cache_invalidations():
+    """Invalidate election/candidate caches on changes made by any worker"""
+    pipeline = [{"$match": {"$or": [
+        {"ns.coll": "elections"},
+        # vote_count updates would fire on every vote; only membership changes matter
+        {"ns.coll": "candidates", "operationType": {"$in": ["insert", "delete", "replace"]}}
+    ]}}]
+    while True:
+        try:
+            async with db.watch(pipeline) as stream:
+                async for change in stream:
+                    if change["ns"]["coll"] == "elections":
+                        election_cache.invalidate()
+                    else:
+                        candidate_cache.invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Cache change stream failed, retrying: {e}")
+            await asyncio.sleep(5)
+
+async def sync_face_index_periodically():
+    """Keep the duplicate-face index in step with registrations from other workers"""
+    while True:
+        try:
+            await face_index.sync(db.users)
+        except Exception as e:
+            logger.error(f"Face index sync failed: {e}")
+        await asyncio.sleep(FACE_INDEX_SYNC_SECONDS)
+
 @api_router.post("/init")
 async def initialize_system():
     """Initialize system with default admin and sample data"""
     try:
         # Create default admin
-        admin_exists = await db.admins.find_one({"email": "admin@voting.gov.in"})
+        admin_exists = await db.admins.find_one({"email": "admin@voting.gov.in"}, {"_id": 1})
         if not admin_exists:
             admin_doc = {
                 "id": str(uuid.uuid4()),
                 "email": "admin@voting.gov.in",
-                "password_hash": hash_password("admin123"),
+                "password_hash": await hash_password_async("admin123"),
                 "name": "System Administrator",
                 "created_at": datetime.now(timezone.utc).isoformat()
             }
@@ -881,27 +1695,68 @@ async def initialize_system():
         logger.error(f"Initialization error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/health/ready")
+async def readiness_check():
+    """Ready only once MongoDB answers and the face model is warm"""
+    checks = {"database": False, "face_model": face_service.ready}
+    try:
+        await client.admin.command('ping')
+        checks["database"] = True
+    except Exception as e:
+        logger.warning(f"Readiness: MongoDB ping failed: {e}")
+    
+    ready = all(checks.values())
+    return ORJSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "checks": checks,
+            "model_load_seconds": face_service.model_load_seconds,
+            "warmup_error": face_service.warmup_error
+        }
+    )
+
 @api_router.get("/")
 async def root():
     return {"message": "AI-Enhanced Digital Voting System API"}
 
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms of the traced requests and log pipeline counters"""
+    log_stats = log_pipeline.stats()
+    log_lines = [
+        "# HELP voting_log_records_discarded_total Log records not written, by reason",
+        "# TYPE voting_log_records_discarded_total counter"
+    ] + [
+        f'voting_log_records_discarded_total{{reason="{reason}"}} {log_stats[reason]}'
+        for reason in ("dropped", "rate_limited", "sampled_out")
+    ]
+    return PlainTextResponse(tracer.render() + "\n".join(log_lines) + "\n", media_type="text/plain; version=0.0.4")
+
 @app.on_event("startup")
 async def startup_db_client():
     """Check MongoDB connection, create default admin, and warn about security"""
+    global vote_transactions_enabled
     try:
         # Test MongoDB connection
         await client.admin.command('ping')
         logger.info("OK: MongoDB connected successfully")
         
+        # Transactions need a replica set or sharded cluster
+        if VOTE_TRANSACTIONS == "auto":
+            hello = await client.admin.command('hello')
+            vote_transactions_enabled = 'setName' in hello or hello.get('msg') == 'isdbgrid'
+        logger.info(f"OK: Vote transactions {'enabled' if vote_transactions_enabled else 'disabled (standalone MongoDB)'}")
+        
         # Auto-create default admin if not exists
-        admin_exists = await db.admins.find_one({"email": "admin@voting.gov.in"})
+        admin_exists = await db.admins.find_one({"email": "admin@voting.gov.in"}, {"_id": 1})
         if not admin_exists:
             admin_doc = {
                 "id": str(uuid.uuid4()),
                 "email": "admin@voting.gov.in",
-                "password_hash": hash_password("admin123"),
+                "password_hash": await hash_password_async("admin123"),
                 "name": "System Administrator",
                 "created_at": datetime.now(timezone.utc).isoformat()
             }
@@ -909,15 +1764,43 @@ async def startup_db_client():
             logger.info("OK: Default admin created: admin@voting.gov.in / admin123")
         else:
             logger.info("OK: Admin account exists")
+        
+        # Indexes for every hot query path (see indexes.py); the counter
+        # backfill relies on the unique vote_counters index being in place
+        if await ensure_indexes(db):
+            logger.warning("WARNING: Some indexes could not be created, run 'python indexes.py verify'")
+        else:
+            logger.info("OK: Indexes in place")
+        await backfill_vote_counters()
             
     except Exception as e:
         logger.error(f"ERROR: MongoDB connection failed: {e}")
         logger.error("Please ensure MongoDB is running on mongodb://localhost:27017")
     
+    # Start face inference workers; the model warms up in the background
+    # and /api/health/ready reports 503 until it is loaded
+    await face_service.start()
+    
+    # Load existing face embeddings into the duplicate index
+    background_tasks.append(asyncio.create_task(sync_face_index_periodically()))
+    if FRAUD_SCORING:
+        # The model is loaded by whichever worker gets the lease
+        background_tasks.append(asyncio.create_task(fraud_scorer.run(
+            db.votes, FRAUD_SCORE_INTERVAL_SECONDS, FRAUD_REFIT_INTERVAL_SECONDS, leases=db.job_leases
+        )))
+    background_tasks.append(asyncio.create_task(results_aggregator.run()))
+    background_tasks.append(asyncio.create_task(stats_service.run(db)))
+    background_tasks.append(asyncio.create_task(notification_outbox.run(db)))
+    if CACHE_CHANGE_STREAMS:
+        background_tasks.append(asyncio.create_task(watch_cache_invalidations()))
+    
     # Security warning
     if JWT_SECRET == 'your-secret-key-change-in-production':
         logger.warning("WARNING: Using default JWT_SECRET! Change it in .env file for production!")
 
+if REQUEST_TRACING:
+    app.add_middleware(TracingMiddleware, tracer=tracer, operations=TRACED_OPERATIONS, server_timing=SERVER_TIMING)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -928,4 +1811,13 @@ app.add_middleware(
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Interrupted imports resume from their last checkpoint when the manifest is re-uploaded
+    tasks = background_tasks + list(voter_import_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Pending hash upgrades are short; let them finish (a skipped one is redone on the next login)
+    await asyncio.gather(*rehash_tasks, return_exceptions=True)
+    await face_service.stop()
+    password_executor.shutdown(wait=False)
     client.close()
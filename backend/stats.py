@@ -0,0 +1,164 @@
+"""
+Running admin dashboard counters for the AI-Enhanced Voting System.
+
+Writes bump counters spread over a few shard documents (so the vote path
+never funnels into one hot document); the dashboard sums the shards, which
+costs the same at any registry size. A background pass periodically
+recounts the real collections and corrects any drift.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ["total_users", "total_elections", "active_elections", "total_votes"]
+GENDERS = ["Male", "Female", "Other"]
+META_ID = "meta"
+
+def gender_bucket(gender: Optional[str]) -> str:
+    return gender if gender in GENDERS else "Other"
+
+class StatsService:
+    """Sharded running counters with periodic reconciliation against MongoDB"""
+
+    def __init__(self, collection: str = "stats_counters", shards: int = 8,
+                 reconcile_interval: float = 300.0):
+        self.collection = collection
+        self.shards = shards
+        self.reconcile_interval = reconcile_interval
+        self.reconciles = 0
+        self.last_drift: Dict[str, int] = {}
+
+    async def increment(self, db, gender: Optional[str] = None, **deltas: int):
+        """$inc the given counters (and optionally one gender bucket) on a random shard"""
+        inc = {name: value for name, value in deltas.items() if value}
+        if gender is not None:
+            inc[f"gender.{gender_bucket(gender)}"] = deltas.get("total_users", 1)
+        if not inc:
+            return
+        await db[self.collection].update_one(
+            {"_id": random.randrange(self.shards)},
+            {"$inc": inc},
+            upsert=True
+        )
+
+    async def _sum_shards(self, db) -> Dict[str, Any]:
+        totals: Dict[str, Any] = {name: 0 for name in COUNTERS}
+        totals["gender_stats"] = {g: 0 for g in GENDERS}
+        meta = None
+        async for doc in db[self.collection].find({}):
+            if doc["_id"] == META_ID:
+                meta = doc
+                continue
+            for name in COUNTERS:
+                totals[name] += doc.get(name, 0)
+            for g, count in doc.get("gender", {}).items():
+                totals["gender_stats"][gender_bucket(g)] += count
+        totals["_meta"] = meta
+        return totals
+
+    async def _counted(self, db) -> Dict[str, int]:
+        """Shard totals keyed like the $inc fields (gender buckets as gender.<bucket>)"""
+        current = await self._sum_shards(db)
+        counted = {name: current[name] for name in COUNTERS}
+        counted.update({f"gender.{g}": current["gender_stats"][g] for g in GENDERS})
+        return counted
+
+    async def snapshot(self, db) -> Dict[str, Any]:
+        """Current counters plus how long ago they were last checked against the database"""
+        totals = await self._sum_shards(db)
+        meta = totals.pop("_meta")
+        reconciled_at = meta.get("reconciled_at") if meta else None
+        if reconciled_at is not None:
+            age = (datetime.now(timezone.utc) - reconciled_at.replace(tzinfo=timezone.utc)).total_seconds()
+        else:
+            age = None
+        totals["freshness"] = {
+            "reconciled_at": reconciled_at.replace(tzinfo=timezone.utc).isoformat() if reconciled_at else None,
+            "seconds_since_reconcile": round(age, 1) if age is not None else None,
+            "last_drift": meta.get("drift", {}) if meta else {}
+        }
+        return totals
+
+    async def _claim_reconcile(self, db) -> bool:
+        """Only one worker recounts per interval: claim the pass on the meta document"""
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.reconcile_interval)
+        try:
+            await db[self.collection].find_one_and_update(
+                {"_id": META_ID, "$or": [{"claimed_at": {"$lt": cutoff}}, {"claimed_at": None}]},
+                {"$set": {"claimed_at": now}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # The meta document exists and another worker claimed this interval
+            return False
+
+    async def reconcile(self, db, force: bool = False) -> Optional[Dict[str, int]]:
+        """Recount from the source collections and fold the difference into shard 0"""
+        if not force and not await self._claim_reconcile(db):
+            return None
+
+        started = time.monotonic()
+        # The shards keep counting while the collections are recounted, so sum them on both
+        # sides of the recount: their value at the moment of the count lies in between
+        before = await self._counted(db)
+        truth: Dict[str, int] = {
+            "total_users": await db.users.count_documents({}),
+            "total_elections": await db.elections.count_documents({}),
+            "active_elections": await db.elections.count_documents({"status": "active"}),
+            "total_votes": await db.votes.count_documents({})
+        }
+        genders = await db.users.aggregate([
+            {"$group": {"_id": "$gender", "count": {"$sum": 1}}}
+        ]).to_list(100)
+        for g in GENDERS:
+            truth[f"gender.{g}"] = 0
+        for g in genders:
+            truth[f"gender.{gender_bucket(g['_id'])}"] += g["count"]
+        after = await self._counted(db)
+
+        # Correct only by the part of the difference that holds for any point in that range;
+        # writes still in flight can leave an off-by-a-few that the next pass corrects
+        drift = {}
+        for name in truth:
+            low, high = sorted((truth[name] - before[name], truth[name] - after[name]))
+            if low > 0:
+                drift[name] = low
+            elif high < 0:
+                drift[name] = high
+        # Applied as an increment so the shards keep counting while we fix them
+        if drift:
+            await db[self.collection].update_one({"_id": 0}, {"$inc": drift}, upsert=True)
+        await db[self.collection].update_one(
+            {"_id": META_ID},
+            {"$set": {
+                "reconciled_at": datetime.now(timezone.utc),
+                "drift": {name.replace(".", "_"): value for name, value in drift.items()}
+            }},
+            upsert=True
+        )
+        self.reconciles += 1
+        self.last_drift = drift
+        if drift:
+            logger.info(f"Stats reconciled in {time.monotonic() - started:.2f}s, corrected drift {drift}")
+        return drift
+
+    async def run(self, db):
+        """Background loop: reconcile every reconcile_interval (first pass immediately)"""
+        while True:
+            try:
+                await self.reconcile(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reconciling stats: {e}")
+            await asyncio.sleep(self.reconcile_interval)
@@ -0,0 +1,168 @@
+"""
+Per-stage request tracing for the AI-Enhanced Voting System.
+
+TracingMiddleware opens a trace for the requests it is told to watch, code
+on the request path marks its stages with `with tracer.stage("name"):`, and
+when the response goes out every stage (plus the whole request) is observed
+into Prometheus-style histograms. Optionally the stage timings are sent back
+to the client in a Server-Timing header.
+
+Outside a trace `stage()` is a context-variable lookup returning a shared
+no-op context manager, so instrumented code costs next to nothing when
+tracing is off.
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds: sub-millisecond cache hits up to slow face inference
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NO_STAGE = nullcontext()
+_current: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values, rendered in the Prometheus text format"""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...], buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, label_values: Tuple[str, ...], seconds: float):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, seconds)] += 1
+        series[1] += seconds
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+class Trace:
+    """Stage durations of one request; a stage entered more than once accumulates"""
+
+    __slots__ = ("operation", "started", "stages")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in self.stages.items()]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+class _Stage:
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, time.perf_counter() - self.started)
+        return False
+
+class Tracer:
+    """Stage timers for the current request and the histograms they feed"""
+
+    def __init__(self, prefix: str = "voting", buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.stage_seconds = Histogram(
+            f"{prefix}_request_stage_seconds", "Time spent in each stage of a traced request",
+            ("operation", "stage"), buckets
+        )
+        self.request_seconds = Histogram(
+            f"{prefix}_request_duration_seconds", "Total time of a traced request",
+            ("operation", "status"), buckets
+        )
+
+    def stage(self, name: str):
+        """Context manager timing a stage of the current trace (no-op outside one)"""
+        trace = _current.get()
+        if trace is None:
+            return _NO_STAGE
+        return _Stage(trace, name)
+
+    async def timed(self, name: str, awaitable):
+        """Await as a stage; for lookups that run side by side under asyncio.gather"""
+        with self.stage(name):
+            return await awaitable
+
+    def record(self, name: str, seconds: float):
+        """Add a stage measured elsewhere (e.g. time spent queued for a worker)"""
+        trace = _current.get()
+        if trace is not None:
+            trace.add(name, seconds)
+
+    def finish(self, trace: Trace, status: int) -> float:
+        total = time.perf_counter() - trace.started
+        for stage, seconds in trace.stages.items():
+            self.stage_seconds.observe((trace.operation, stage), seconds)
+        self.request_seconds.observe((trace.operation, str(status)), total)
+        return total
+
+    def render(self) -> str:
+        return "\n".join(self.stage_seconds.render() + self.request_seconds.render()) + "\n"
+
+class TracingMiddleware:
+    """ASGI middleware tracing the requests whose path is in `operations` (path -> operation name)"""
+
+    def __init__(self, app, tracer: Tracer, operations: Dict[str, str], server_timing: bool = False):
+        self.app = app
+        self.tracer = tracer
+        self.operations = operations
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        operation = self.operations.get(scope["path"]) if scope["type"] == "http" else None
+        if operation is None:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(operation)
+        token = _current.set(trace)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    # The handler has returned by now, so every stage is in the trace
+                    total = time.perf_counter() - trace.started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", trace.server_timing(total).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self.tracer.finish(trace, status)
@@ -0,0 +1,348 @@
+"""
+Bulk Voter Import for AI-Enhanced Voting System
+Registers voters from a CSV or JSONL manifest plus a directory or zip archive of face images
+
+Manifest columns / keys: name, aadhaar, email, password, gender (optional),
+face_image (optional, path of the image inside the directory or archive).
+
+Rows are processed in batches: email/Aadhaar uniqueness is checked with one
+$in query per batch, embeddings come from the face inference process pool,
+passwords are hashed in parallel and voters are written with unordered
+insert_many.
+Progress is checkpointed in db.voter_imports after every batch, keyed by a
+hash of the manifest, so re-running the same manifest resumes where it stopped.
+A face service that stays busy or down fails the batch instead of its rows,
+so the resume picks those rows up again.
+
+Usage (from the backend directory):
+    python voter_import.py voters.csv --images faces.zip [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import re
+import threading
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from pydantic import EmailStr, TypeAdapter
+from pymongo.errors import BulkWriteError
+
+from face_index import FaceIndex
+
+logger = logging.getLogger(__name__)
+
+AADHAAR_PATTERN = re.compile(r'^\d{12}$')
+_email = TypeAdapter(EmailStr)
+
+# Per-row error messages kept in the progress document
+MAX_REPORTED_ERRORS = 1000
+
+# Face service responses that say "not now" rather than "bad image" (busy, restarting, timed out).
+# They are retried with backoff; if they persist the batch is left unprocessed for a resume.
+TRANSIENT_FACE_STATUSES = (429, 503, 504)
+FACE_RETRIES = 3
+FACE_RETRY_SECONDS = 2.0
+
+def manifest_id(path: Path) -> str:
+    """Stable import id for a manifest file, so a re-run resumes the same import"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:24]
+
+def read_manifest(path: Path) -> Iterator[Dict[str, str]]:
+    """Rows of a .csv or .jsonl manifest as dicts of strings"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson", ".json"):
+            for line in f:
+                if line.strip():
+                    yield {k: "" if v is None else str(v) for k, v in json.loads(line).items()}
+        else:
+            yield from csv.DictReader(f)
+
+class ImageSource:
+    """Face images looked up by name in a directory or a zip archive"""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self._zip = zipfile.ZipFile(path) if path and zipfile.is_zipfile(path) else None
+        # ZipFile shares one file handle between reads, and reads run in worker threads
+        self._zip_lock = threading.Lock()
+        if path is not None and self._zip is None and not path.is_dir():
+            raise ValueError(f"{path} is neither a directory nor a zip archive")
+
+    def read(self, name: str) -> Optional[bytes]:
+        if not name or self.path is None:
+            return None
+        if self._zip is not None:
+            try:
+                with self._zip_lock:
+                    return self._zip.read(name)
+            except KeyError:
+                return None
+        candidate = (self.path / name).resolve()
+        # Manifest entries must not reach outside the image directory
+        if self.path.resolve() not in candidate.parents or not candidate.is_file():
+            return None
+        return candidate.read_bytes()
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+class VoterImporter:
+    """Batched, resumable voter registration from a manifest"""
+
+    def __init__(self, db, hash_password: Callable[[str], Awaitable[str]],
+                 extract_embedding: Callable[[bytes], Awaitable[Optional[List[float]]]],
+                 encode_embedding: Callable[[List[float]], Any],
+                 face_index=None, on_inserted: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+                 batch_size: int = 500, face_concurrency: int = 16):
+        self.db = db
+        self.hash_password = hash_password
+        self.extract_embedding = extract_embedding
+        self.encode_embedding = encode_embedding
+        self.face_index = face_index
+        self.on_inserted = on_inserted
+        self.batch_size = batch_size
+        # Stay below the face service queue bound so bulk work never gets 429s
+        self._face_slots = asyncio.Semaphore(face_concurrency)
+
+    async def _progress(self, import_id: str) -> Dict[str, Any]:
+        progress = await self.db.voter_imports.find_one({"_id": import_id})
+        if progress is None:
+            progress = {
+                "_id": import_id, "status": "running", "processed": 0, "inserted": 0,
+                "duplicates": 0, "failed": 0, "errors": [],
+                "started_at": datetime.now(timezone.utc).isoformat()
+            }
+            await self.db.voter_imports.insert_one(progress)
+        return progress
+
+    async def _checkpoint(self, progress: Dict[str, Any], **fields):
+        progress.update(fields, updated_at=datetime.now(timezone.utc).isoformat())
+        await self.db.voter_imports.update_one(
+            {"_id": progress["_id"]},
+            {"$set": {k: v for k, v in progress.items() if k != "_id"}}
+        )
+
+    def _validate(self, line: int, row: Dict[str, str], errors: List[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        name = (row.get("name") or "").strip()
+        aadhaar = (row.get("aadhaar") or "").strip()
+        password = row.get("password") or ""
+        try:
+            email = _email.validate_python((row.get("email") or "").strip())
+        except Exception:
+            errors.append({"row": line, "error": "Invalid email"})
+            return None
+        if not name or not password:
+            errors.append({"row": line, "error": "Name and password are required"})
+            return None
+        if not AADHAAR_PATTERN.match(aadhaar):
+            errors.append({"row": line, "error": "Invalid Aadhaar format. Must be 12 digits."})
+            return None
+        return {
+            "row": line, "name": name, "aadhaar": aadhaar, "email": email, "password": password,
+            "gender": (row.get("gender") or "Other").strip() or "Other",
+            "face_image": (row.get("face_image") or "").strip()
+        }
+
+    async def _embedding(self, row: Dict[str, Any], images: ImageSource, errors: List[Dict[str, Any]]):
+        if not row["face_image"]:
+            return []
+        # Decompressing or reading the file blocks; keep it off the event loop
+        data = await asyncio.to_thread(images.read, row["face_image"])
+        if data is None:
+            errors.append({"row": row["row"], "error": f"Face image not found: {row['face_image']}"})
+            return None
+        for attempt in range(FACE_RETRIES + 1):
+            try:
+                async with self._face_slots:
+                    return await self.extract_embedding(data) or None
+            except Exception as e:
+                if getattr(e, "status_code", None) not in TRANSIENT_FACE_STATUSES:
+                    errors.append({"row": row["row"], "error": f"Face registration failed: {getattr(e, 'detail', e)}"})
+                    return None
+                if attempt == FACE_RETRIES:
+                    # Not the row's fault: fail the batch so its checkpoint isn't advanced
+                    raise RuntimeError(
+                        f"Face service unavailable at row {row['row']} ({getattr(e, 'detail', e)}); re-run to resume"
+                    ) from e
+                await asyncio.sleep(FACE_RETRY_SECONDS * 2 ** attempt)
+
+    async def _import_batch(self, lines: List[tuple], images: ImageSource) -> Dict[str, Any]:
+        errors: List[Dict[str, Any]] = []
+        duplicates = 0
+        rows = [r for r in (self._validate(line, row, errors) for line, row in lines) if r]
+
+        # Drop repeats inside the batch, then everything already registered, with one query per field
+        seen_emails, seen_aadhaar, unique_rows = set(), set(), []
+        for row in rows:
+            if row["email"] in seen_emails or row["aadhaar"] in seen_aadhaar:
+                duplicates += 1
+                continue
+            seen_emails.add(row["email"])
+            seen_aadhaar.add(row["aadhaar"])
+            unique_rows.append(row)
+        taken = await self.db.users.find(
+            {"$or": [{"email": {"$in": list(seen_emails)}}, {"aadhaar": {"$in": list(seen_aadhaar)}}]},
+            {"_id": 0, "email": 1, "aadhaar": 1}
+        ).to_list(None)
+        taken_emails = {u.get("email") for u in taken}
+        taken_aadhaar = {u.get("aadhaar") for u in taken}
+        fresh = [r for r in unique_rows if r["email"] not in taken_emails and r["aadhaar"] not in taken_aadhaar]
+        duplicates += len(unique_rows) - len(fresh)
+
+        # Embeddings (process pool) and bcrypt (thread pool) run side by side
+        embeddings, hashes = await asyncio.gather(
+            asyncio.gather(*[self._embedding(r, images, errors) for r in fresh]),
+            asyncio.gather(*[self.hash_password(r["password"]) for r in fresh])
+        )
+
+        # Faces accepted earlier in this batch aren't in the shared index until the insert
+        batch_faces = FaceIndex(threshold=self.face_index.threshold, shard_size=max(1, len(fresh))) \
+            if self.face_index is not None else None
+        docs, doc_embeddings = [], {}
+        for row, embedding, hashed in zip(fresh, embeddings, hashes):
+            if embedding is None:
+                continue
+            if embedding and self.face_index is not None:
+                match = await asyncio.to_thread(self.face_index.search, embedding)
+                if match or batch_faces.search(embedding):
+                    errors.append({"row": row["row"], "error": "Face already registered to another voter"})
+                    continue
+            user_id = str(uuid.uuid4())
+            doc_embeddings[user_id] = embedding
+            if embedding and batch_faces is not None:
+                batch_faces.add(user_id, embedding)
+            docs.append({
+                "id": user_id,
+                "name": row["name"],
+                "aadhaar": row["aadhaar"],
+                "gender": row["gender"],
+                "email": row["email"],
+                "password_hash": hashed,
+                "face_embedding": self.encode_embedding(embedding) if embedding else [],
+                "status": "active",
+                "voted": False,
+                "voted_elections": []
+            })
+
+        inserted = docs
+        if docs:
+            # Stamped right before the write, so other workers' face index syncs see it in time
+            now = datetime.now(timezone.utc).isoformat()
+            for doc in docs:
+                doc["created_at"] = now
+            try:
+                await self.db.users.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: everything but the failed documents was written
+                write_errors = e.details.get("writeErrors", [])
+                failed_indexes = {err["index"] for err in write_errors}
+                for err in write_errors:
+                    if err.get("code") == 11000:
+                        duplicates += 1
+                    else:
+                        errors.append({"row": None, "error": err.get("errmsg", "insert failed")})
+                inserted = [d for i, d in enumerate(docs) if i not in failed_indexes]
+
+        if self.face_index is not None:
+            for doc in inserted:
+                if doc_embeddings[doc["id"]]:
+                    self.face_index.add(doc["id"], doc_embeddings[doc["id"]])
+        if inserted and self.on_inserted is not None:
+            await self.on_inserted(inserted)
+
+        return {"inserted": len(inserted), "duplicates": duplicates, "errors": errors}
+
+    async def run(self, import_id: str, rows: Iterator[Dict[str, str]], images: ImageSource,
+                  on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Import every row after the last checkpoint; returns the final progress document"""
+        progress = await self._progress(import_id)
+        if progress["status"] == "completed":
+            return progress
+        await self._checkpoint(progress, status="running")
+
+        skip = progress["processed"]
+        batch: List[tuple] = []
+
+        async def flush():
+            result = await self._import_batch(batch, images)
+            errors = (progress["errors"] + result["errors"])[:MAX_REPORTED_ERRORS]
+            await self._checkpoint(
+                progress,
+                processed=progress["processed"] + len(batch),
+                inserted=progress["inserted"] + result["inserted"],
+                duplicates=progress["duplicates"] + result["duplicates"],
+                failed=progress["failed"] + len(result["errors"]),
+                errors=errors
+            )
+            if on_progress:
+                on_progress(progress)
+
+        try:
+            for line, row in enumerate(rows, start=1):
+                if line <= skip:
+                    continue
+                batch.append((line, row))
+                if len(batch) >= self.batch_size:
+                    await flush()
+                    batch = []
+            if batch:
+                await flush()
+            await self._checkpoint(progress, status="completed")
+        except Exception as e:
+            await self._checkpoint(progress, status="failed", error=str(e))
+            raise
+        return progress
+
+async def main(manifest: Path, images_path: Optional[Path], batch_size: int):
+    # The app module supplies the same hashing, face pipeline and counters as /auth/register
+    import server
+
+    images = ImageSource(images_path)
+    import_id = manifest_id(manifest)
+    try:
+        await server.db.command('ping')
+        print("✓ Connected to MongoDB")
+        await server.face_service.start()
+        # Loading the model takes longer than a request timeout; don't let the first rows time out
+        if not await server.face_service.wait_ready():
+            raise SystemExit(f"✗ Face model failed to load: {server.face_service.warmup_error}")
+        await server.face_index.sync(server.db.users)
+
+        importer = server.build_voter_importer(batch_size=batch_size)
+        print(f"Importing {manifest.name} (import id {import_id})")
+        progress = await importer.run(
+            import_id, read_manifest(manifest), images,
+            on_progress=lambda p: print(
+                f"  ... {p['processed']} rows: {p['inserted']} inserted, "
+                f"{p['duplicates']} duplicates, {p['failed']} failed"
+            )
+        )
+        print(f"✓ {progress['inserted']} voters imported, {progress['duplicates']} duplicates, {progress['failed']} failed")
+        for error in progress["errors"][:20]:
+            print(f"  row {error['row']}: {error['error']}")
+    finally:
+        images.close()
+        await server.face_service.stop()
+        server.client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-register voters from a CSV/JSONL manifest")
+    parser.add_argument("manifest", type=Path)
+    parser.add_argument("--images", type=Path, help="Directory or zip archive with the face images")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.manifest, args.images, args.batch_size))
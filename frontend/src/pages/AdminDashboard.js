@@ -19,10 +19,16 @@ const AdminDashboard = () => {
   const [stats, setStats] = useState({});
   const [elections, setElections] = useState([]);
   const [voters, setVoters] = useState([]);
+  const [votersCursor, setVotersCursor] = useState(null);
+  const [votersTotal, setVotersTotal] = useState(null);
+  const [voterSearch, setVoterSearch] = useState('');
+  // The search the listed voters were fetched with; "Load more" pages through that one
+  const [appliedVoterSearch, setAppliedVoterSearch] = useState('');
   const [fraudData, setFraudData] = useState([]);
   const [selectedElection, setSelectedElection] = useState(null);
   const [candidates, setCandidates] = useState([]);
   const [results, setResults] = useState(null);
+  const [resultsElection, setResultsElection] = useState('');
   const [loading, setLoading] = useState(true);
   const [fraudMetrics, setFraudMetrics] = useState(null);
 
@@ -94,17 +100,28 @@ const AdminDashboard = () => {
     }
   };
 
-  const fetchVoters = async (token) => {
+  const fetchVoters = async (token, { cursor = null, search = appliedVoterSearch } = {}) => {
     try {
       const response = await axios.get(`${API}/admin/voters`, {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: { Authorization: `Bearer ${token}` },
+        params: { cursor: cursor || undefined, search: search || undefined }
       });
-      setVoters(response.data.voters || []);
+      const page = response.data.voters || [];
+      setVoters((prev) => (cursor ? [...prev, ...page] : page));
+      setVotersCursor(response.data.next_cursor || null);
+      setAppliedVoterSearch(search);
+      // The total only comes with the first page
+      if (!cursor) setVotersTotal(response.data.total ?? null);
     } catch (error) {
       console.error('Voters fetch error:', error);
     }
   };
 
+  const handleVoterSearch = (e) => {
+    e.preventDefault();
+    fetchVoters(localStorage.getItem('adminToken'), { search: voterSearch });
+  };
+
   const fetchCandidates = async (electionId, token) => {
     try {
       const response = await axios.get(`${API}/elections/${electionId}/candidates`, {
@@ -121,12 +138,59 @@ const AdminDashboard = () => {
       const response = await axios.get(`${API}/admin/results/${electionId}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
-      setResults(response.data);
+      // The live stream may already have delivered a newer snapshot
+      setResults((prev) => (
+        prev && prev.candidates?.[0]?.election_id === electionId && prev.version > response.data.version
+          ? prev
+          : response.data
+      ));
     } catch (error) {
       toast.error('Failed to fetch results');
     }
   };
 
+  // Live results: the server pushes a fresh payload whenever the tallies change
+  useEffect(() => {
+    if (!resultsElection) return undefined;
+    const token = localStorage.getItem('adminToken');
+    let source = null;
+    let retry = null;
+    let closed = false;
+
+    // The stream URL carries a short-lived ticket, never the admin token, so every
+    // (re)connect asks for a fresh one instead of relying on EventSource's own retries
+    const connect = async () => {
+      try {
+        const response = await axios.post(
+          `${API}/admin/results/${resultsElection}/stream-ticket`,
+          {},
+          { headers: { Authorization: `Bearer ${token}` } }
+        );
+        if (closed) return;
+        source = new EventSource(
+          `${API}/admin/results/${resultsElection}/stream?ticket=${encodeURIComponent(response.data.ticket)}`
+        );
+        source.addEventListener('results', (event) => {
+          setResults(JSON.parse(event.data));
+        });
+        source.onerror = () => {
+          // Keep showing the last snapshot meanwhile
+          console.error('Live results stream interrupted');
+          source.close();
+          retry = setTimeout(connect, 3000);
+        };
+      } catch (error) {
+        if (!closed) retry = setTimeout(connect, 3000);
+      }
+    };
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      if (source) source.close();
+    };
+  }, [resultsElection]);
+
   const fetchFraudData = async (token) => {
     try {
       const response = await axios.get(`${API}/admin/fraud/detect`, {
@@ -652,9 +716,20 @@ const AdminDashboard = () => {
             <Card>
               <CardHeader>
                 <CardTitle>Registered Voters</CardTitle>
-                <CardDescription>{voters.length} voter(s) registered</CardDescription>
+                <CardDescription>
+                  {votersTotal ?? voters.length} voter(s) {appliedVoterSearch ? 'matching' : 'registered'}
+                </CardDescription>
               </CardHeader>
               <CardContent>
+                <form onSubmit={handleVoterSearch} className="flex gap-2 mb-4">
+                  <Input
+                    value={voterSearch}
+                    onChange={(e) => setVoterSearch(e.target.value)}
+                    placeholder="Search by start of name or email"
+                    data-testid="voter-search-input"
+                  />
+                  <Button type="submit" variant="outline" data-testid="voter-search-button">Search</Button>
+                </form>
                 <div className="overflow-x-auto">
                   <table className="w-full" data-testid="voters-table">
                     <thead>
@@ -707,6 +782,17 @@ const AdminDashboard = () => {
                     </tbody>
                   </table>
                 </div>
+                {votersCursor && (
+                  <div className="flex justify-center mt-4">
+                    <Button
+                      variant="outline"
+                      onClick={() => fetchVoters(localStorage.getItem('adminToken'), { cursor: votersCursor, search: appliedVoterSearch })}
+                      data-testid="voters-load-more"
+                    >
+                      Load more
+                    </Button>
+                  </div>
+                )}
               </CardContent>
             </Card>
           </TabsContent>
@@ -727,6 +813,7 @@ const AdminDashboard = () => {
                       data-testid="results-election-select"
                       className="flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm"
                       onChange={(e) => {
+                        setResultsElection(e.target.value);
                         if (e.target.value) {
                           fetchResults(e.target.value, localStorage.getItem('adminToken'));
                         } else {
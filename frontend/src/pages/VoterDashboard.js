@@ -47,29 +47,14 @@ const VoterDashboard = () => {
 
   const fetchElections = async (token) => {
     try {
-      const response = await axios.get(`${API}/elections/active`, {
+      // One request returns the active elections with this voter's status for each
+      const response = await axios.get(`${API}/elections/active/status`, {
         headers: { Authorization: `Bearer ${token}` }
       });
 
-      setElections(response.data.elections || []);
-
-      // Check vote status for each election
-      const statuses = await Promise.all(
-        response.data.elections.map(async (election) => {
-          try {
-            const statusRes = await axios.get(
-              `${API}/vote/status/${election.id}`,
-              { headers: { Authorization: `Bearer ${token}` } }
-            );
-            return { electionId: election.id, hasVoted: statusRes.data.has_voted };
-          } catch {
-            return { electionId: election.id, hasVoted: false };
-          }
-        })
-      );
-
-      const votedIds = statuses.filter(s => s.hasVoted).map(s => s.electionId);
-      setVotedElections(votedIds);
+      const activeElections = response.data.elections || [];
+      setElections(activeElections);
+      setVotedElections(activeElections.filter(e => e.has_voted).map(e => e.id));
     } catch (error) {
       toast.error('Failed to fetch elections');
     } finally {